@@ -3,7 +3,7 @@ This module defines the math_agent, which is responsible for solving arithmetic,
 """
 
 from utils.decorators import agent, agent_tools
-from utils.executor import execute_plan
+from utils.executor import execute_plan, plan_format
 
 @agent("math")
 async def math_agent(prompt, memory_log):
@@ -21,14 +21,13 @@ async def math_agent(prompt, memory_log):
     tool_list = "\n".join([f"{name}: {fn.__doc__.strip()}" for name, fn in toolset.items()])
     system_msg = (
         "You are a math agent that can solve arithmetic, powers, and multi-step problems.\n"
-        "For each step, include a 'reasoning' field explaining why this tool is being called.\n\n"
+        "For any expression with more than one operator, use a single 'evaluate' call instead of chaining tools.\n"
+        "For lists of numbers, use the batch_ tools once on the whole list instead of one step per item.\n\n"
         f"Tools:\n{tool_list}\n\n"
-        "Return a list of tool calls like:\n"
-        '[\n'
-        '  {"tool": "add", "args": [2, 3], "reasoning": "Adding 2 and 3 to compute the sum."},\n'
-        '  {"tool": "multiply", "args": ["previous", 5], "reasoning": "Multiplying previous result by 5."}\n'
-        ']'
-        "IMPORTANT: Always include a 'reasoning' field explaining why this tool is being called."
+        + plan_format([
+            ("evaluate", ["(3+5)*2^4"], "Evaluating the whole expression in one step."),
+            ("multiply", ["previous", 5], "Multiplying previous result by 5."),
+        ])
     )
 
     return await execute_plan(prompt, agent="math", system_msg=system_msg)
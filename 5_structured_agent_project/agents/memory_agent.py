@@ -1,19 +1,32 @@
 # agents/memory_agent.py
 
+import re
+
+from config import MEMORY_MIN_SCORE
 from utils.decorators import agent
 
+# Words that don't change what a positional lookup asks for.
+_FILLER = {"what", "was", "is", "my", "the", "last", "previous", "your", "me", "show", "get", "return", "recall", "tell"}
+
 @agent("memory")
 async def memory_agent(task, memory_log):
     if not memory_log:
         return {"result": "Memory is empty."}
-    task = task.lower()
+    task = task.lower().strip()
+    # Bare lookups like "last question" or "2" are answered by position; anything
+    # with more content, e.g. "what did I ask about the moon?", is a nearest-neighbour lookup.
+    words = set(re.findall(r"[a-z]+", task)) - _FILLER
     try:
-        if "question" in task:
-            return {"result": memory_log[-1][0]}
-        elif "answer" in task or "result" in task:
-            return {"result": memory_log[-1][1]}
-        else:
-            index = int(task)
-            return {"result": memory_log[index][1]}
+        if words == {"question"}:
+            return {"result": memory_log[-1].prompt}
+        elif words in ({"answer"}, {"result"}):
+            return {"result": memory_log[-1].result}
+        elif task.lstrip("-").isdigit():
+            return {"result": memory_log[int(task)].result}
     except:
         return {"result": f"Memory access unclear: {task}"}
+
+    hits = await memory_log.search(task, k=3, min_score=MEMORY_MIN_SCORE)
+    if not hits:
+        return {"result": f"Nothing in memory matches: {task}"}
+    return {"result": [{"question": entry.prompt, "answer": entry.result} for _, entry in hits]}
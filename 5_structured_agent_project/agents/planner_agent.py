@@ -1,13 +1,12 @@
 import json
-from openai import AsyncOpenAI
-from config import OPENAI_API_KEY
+from memory_store.context import build_context
 from utils.decorators import agent, agent_registry
-
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+from utils.llm import complete
+from utils.metrics import PARSE_FAILURES
 
 @agent("planner")
 async def planner_agent(prompt, memory_log):
-    context = "\n".join([f"- {q} → {r}" for q, r in memory_log[-5:]]) or "No history."
+    context = await build_context(memory_log, prompt)
     available_agents = [a for a in agent_registry if a != "planner"]
     agent_list = "\n".join([f"- {a}" for a in available_agents])
 
@@ -15,13 +14,18 @@ async def planner_agent(prompt, memory_log):
         f"You are a routing agent.\nAvailable agents:\n{agent_list}\n\n"
         f"Recent memory:\n{context}\n\n"
         f"Decide which agent to use and what task to pass it.\n"
-        f"Return JSON like: {{\"agent\": \"math\", \"task\": \"Add 3 and 5\"}}"
-    )
-    res = await client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": prompt}
-        ]
+        f"Return JSON like: {{\"agent\": \"math\", \"task\": \"Add 3 and 5\"}}\n\n"
+        f"If the request has several parts for different agents, split it into sub-tasks instead.\n"
+        f"Give each an id; a sub-task that needs another's result lists it in depends_on and may use {{id}} in its task:\n"
+        f"{{\"subtasks\": [{{\"id\": \"words\", \"agent\": \"string\", \"task\": \"Count the words in notes.txt\"}}, "
+        f"{{\"id\": \"sum\", \"agent\": \"math\", \"task\": \"Add {{words}} and 3\", \"depends_on\": [\"words\"]}}]}}"
     )
-    return json.loads(res.choices[0].message.content)
+    res = await complete([
+        {"role": "system", "content": system_msg},
+        {"role": "user", "content": prompt}
+    ], agent="planner")
+    try:
+        return json.loads(res.choices[0].message.content)
+    except json.JSONDecodeError:
+        PARSE_FAILURES.inc(agent="planner")
+        raise
@@ -1,16 +1,20 @@
-from utils.decorators import agent
-from utils.executor import execute_plan
-from tools import rag_tools
+from utils.decorators import agent, agent_tools
+from utils.executor import execute_plan, plan_format
 
 @agent("rag")
 async def rag_agent(prompt, memory_log):
-    toolset = rag_tools.agent_tools["rag"]
+    toolset = agent_tools["rag"]
     tool_list = "\n".join([f"{name}: {fn.__doc__.strip()}" for name, fn in toolset.items()])
     system_msg = (
         "You are a Knowledge Retrieval agent. You can only retrieve information from a vector database.\n"
         "You CANNOT add or modify the database.\n"
+        "When you need several lookups, pass all queries as one list in a single search_vector_db step "
+        "instead of one step per query.\n"
         f"Tools:\n{tool_list}\n\n"
-        "Plan a tool call like:\n"
-        '[{"tool": "search_vector_db", "args": ["What is the sun?"]}]'
+        + plan_format([
+            ("search_vector_db", ["What is the sun?"], "Looking up a single question."),
+            ("search_vector_db", [["What is the sun?", "What orbits the Earth?"], 3, True],
+             "Looking up two questions in one call and merging the results."),
+        ])
     )
     return await execute_plan(prompt, agent="rag", system_msg=system_msg)
@@ -1,5 +1,5 @@
 from utils.decorators import agent, agent_tools
-from utils.executor import execute_plan
+from utils.executor import execute_plan, plan_format
 
 @agent("string")
 async def string_agent(prompt, memory_log):
@@ -7,13 +7,12 @@ async def string_agent(prompt, memory_log):
     tool_list = "\n".join([f"{name}: {fn.__doc__.strip()}" for name, fn in toolset.items()])
     system_msg = (
         "You are a string analysis agent. You can count letters, words, and analyze text.\n"
-        "For each step, include a 'reasoning' field explaining why this tool is being called.\n\n"
+        "For lists of strings, use the batch_ tools once on the whole list instead of one step per item.\n"
+        "For text stored in a file, pass the file path to the _file tools instead of the contents.\n\n"
         f"Tools:\n{tool_list}\n\n"
-        "Return a list of tool calls like:\n"
-        '[\n'
-        '  {"tool": "word_count", "args": ["hello world"], "reasoning": "Counting words in the input string."},\n'
-        '  {"tool": "letter_count", "args": ["previous"], "reasoning": "Counting letters in the previous result."}\n'
-        ']\n'
-        "IMPORTANT: Always include a 'reasoning' field explaining why this tool is being called."
+        + plan_format([
+            ("word_count", ["hello world"], "Counting words in the input string."),
+            ("letter_count", ["previous"], "Counting letters in the previous result."),
+        ])
     )
     return await execute_plan(prompt, agent="string", system_msg=system_msg)
@@ -0,0 +1,85 @@
+"""
+Measures recall@k and latency of the IVF index against exact search.
+
+Builds a synthetic clustered dataset, indexes it with NumpyStore (exact) and
+IVFStore, and reports recall@k and per-query latency for each nprobe value.
+Runs fully offline; no embedding model is loaded.
+
+Run from the project root:
+    python -m benchmarks.ann_benchmark --n 200000 --nlist 512 --nprobe 1 4 8 16 32
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+import numpy as np
+
+from benchmarks.common import percentiles, write_report
+from vector_store.ivf_store import IVFStore
+from vector_store.numpy_store import NumpyStore
+
+def make_dataset(n, dim, clusters, queries, seed=0):
+    """Returns (vectors, query vectors) drawn around random cluster centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = centres[rng.integers(clusters, size=n)] + 1.5 * rng.normal(size=(n, dim)).astype(np.float32)
+    picks = rng.integers(n, size=queries)
+    query_vectors = vectors[picks] + 0.5 * rng.normal(size=(queries, dim)).astype(np.float32)
+    return vectors, query_vectors
+
+def timed_queries(store, queries, top_k, **kwargs):
+    latencies, ids = [], []
+    for q in queries:
+        start = time.perf_counter()
+        result = store.query([q], top_k, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        ids.append(result["ids"][0])
+    return ids, latencies
+
+def recall_at_k(found, truth):
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000, help="clusters in the synthetic data")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--out", default="ann_benchmark.json")
+    args = parser.parse_args()
+
+    vectors, queries = make_dataset(args.n, args.dim, args.clusters, args.queries)
+    ids = [f"doc-{i}" for i in range(args.n)]
+    docs = [""] * args.n
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exact = NumpyStore(os.path.join(tmp, "exact"))
+        exact.add(ids, vectors, docs)
+        truth, exact_latencies = timed_queries(exact, queries, args.top_k)
+        results = [{"index": "exact", "recall": 1.0, **percentiles(exact_latencies)}]
+
+        ivf = IVFStore(os.path.join(tmp, "ivf"), nlist=args.nlist)
+        ivf.add(ids, vectors, docs)
+        start = time.perf_counter()
+        ivf.build()
+        build_seconds = time.perf_counter() - start
+
+        for nprobe in args.nprobe:
+            found, latencies = timed_queries(ivf, queries, args.top_k, nprobe=nprobe)
+            results.append({"index": "ivf", "nprobe": nprobe, "recall": round(recall_at_k(found, truth), 4), **percentiles(latencies)})
+
+    print(f"IVF build: {build_seconds:.2f}s (nlist={args.nlist})")
+    print(f"{'index':>6} {'nprobe':>6} {'recall@' + str(args.top_k):>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(f"{r['index']:>6} {r.get('nprobe', '-'):>6} {r['recall']:>10.4f} {r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f}")
+    write_report(args.out, "ann", results, build_seconds=round(build_seconds, 3), **vars(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Helpers shared by the benchmark scripts.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import time
+
+import numpy as np
+
+def percentiles(samples, points=(50, 95, 99)):
+    """Returns {"p50": ..., "p95": ..., "p99": ...} of a list of latencies, in ms."""
+    if not samples:
+        return {f"p{p}": None for p in points}
+    values = np.percentile(np.asarray(samples) * 1000, points)
+    return {f"p{p}": round(float(v), 3) for p, v in zip(points, values)}
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def write_report(path, name, results, **params):
+    """Writes a machine-readable benchmark report tagged with the commit and machine."""
+    report = {
+        "benchmark": name,
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {path}")
@@ -0,0 +1,279 @@
+"""
+End-to-end benchmark of the agent stack with a scripted fake LLM.
+
+Drives the same scripted scenarios at four levels, from the outside in:
+    router        main.multi_agent_router (planner call + agent, or sub-tasks fanned out
+                  to several agents for FANOUT_SCENARIOS)
+    agent         each agent function (plan call + tools)
+    execute_plan  utils.executor.execute_plan with the default system prompt
+    tool          each tool the scenarios use, through executor.invoke_tool
+
+Every LLM call is answered by utils.llm.FakeChatClient after --llm-latency-ms
+(+ --llm-jitter-ms), and retrieval uses an in-process NumPy store with the
+offline "hash" embedder, so no network access is needed. For each level and
+concurrency it reports throughput, latency percentiles, event-loop lag and the
+mean time per request spent in the LLM, in tools, in trace logging, and in
+everything else (framework overhead). Fanned-out sub-tasks overlap, so their
+stage times can add up to more than the request's latency.
+
+With the router level selected, each FANOUT_SCENARIOS prompt is also run once
+on its own and its wall time is compared with its slowest sub-task and with
+the sum of all sub-tasks. Wall time near the slowest sub-task means the
+branches overlapped. --embed-latency-ms makes every embedding call take that
+long on its thread, like a real model, so the RAG branch is not near-instant.
+
+Run from the project root:
+    python -m benchmarks.e2e_benchmark --concurrency 1 8 32 --requests 200 --out e2e_benchmark.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+os.environ["EMBED_BACKEND"] = "hash"
+os.environ["VECTOR_BACKEND"] = "numpy"
+os.environ["VECTOR_INDEX_PATH"] = os.path.join(_tmp.name, "vector_index")
+os.environ["FILE_TOOLS_ROOT"] = _tmp.name
+os.environ["TRACE_PATH"] = os.path.join(_tmp.name, "agent_spans.jsonl")
+os.environ["MEMORY_DB"] = os.path.join(_tmp.name, "agent_memory.db")
+
+import config
+import main as app
+from benchmarks.common import percentiles, write_report
+from rag_setup.load_rag_data import preload_knowledge_base
+from utils import executor
+from utils.decorators import agent_registry, agent_tools
+from utils.llm import FakeChatClient, ScriptedResponder, set_client
+from utils.sandbox import get_sandbox
+
+LEVELS = ("router", "agent", "execute_plan", "tool")
+
+def _step(tool, *args):
+    return {"tool": tool, "args": list(args), "reasoning": f"Calling {tool}."}
+
+# (agent, prompt, plan). The prompt is also the task the router passes on.
+SCENARIOS = [
+    ("math", "Add 3 and 5", [_step("add", 3, 5)]),
+    ("math", "Multiply 7 by 6 and square the result", [_step("multiply", 7, 6), _step("power", "previous", 2)]),
+    ("math", "What is (12 + 8) * 3?", [_step("evaluate", "(12 + 8) * 3")]),
+    ("math", "Sum the squares of 1, 2, 3 and 4", [_step("batch_power", [1, 2, 3, 4], 2), _step("batch_sum", "previous")]),
+    ("string", "How many words are in 'the quick brown fox jumps'?", [_step("word_count", "the quick brown fox jumps")]),
+    ("string", "Count the letters in 'hello world' and 'agents'", [_step("batch_letter_count", ["hello world", "agents"])]),
+    ("string", "Count the words in sample.txt", [_step("word_count_file", "sample.txt")]),
+    ("rag", "What is the sun?", [_step("search_vector_db", "What is the sun?")]),
+    ("rag", "What orbits the sun, and what orbits the Earth?",
+     [_step("search_vector_db", ["What orbits the sun?", "What orbits the Earth?"], 3, True)]),
+    ("memory", "What was the last answer?", None),
+]
+
+# (prompt, subtasks) the planner splits across agents; every task is a SCENARIOS prompt.
+# Run at the router level only.
+FANOUT_SCENARIOS = [
+    ("Count the words in sample.txt, add 3 and 5, and tell me what the sun is", [
+        {"id": "words", "agent": "string", "task": "Count the words in sample.txt"},
+        {"id": "sum", "agent": "math", "task": "Add 3 and 5"},
+        {"id": "sun", "agent": "rag", "task": "What is the sun?"},
+    ]),
+    ("Multiply 7 by 6 and square it, then add 3 and 5 to that", [
+        {"id": "square", "agent": "math", "task": "Multiply 7 by 6 and square the result"},
+        {"id": "sum", "agent": "math", "task": "Add 3 and 5", "depends_on": ["square"]},
+    ]),
+    ("Tell me what the sun is and what orbits the sun and the Earth", [
+        {"id": "sun", "agent": "rag", "task": "What is the sun?"},
+        {"id": "orbits", "agent": "rag", "task": "What orbits the sun, and what orbits the Earth?"},
+    ]),
+]
+
+def make_responder():
+    """Scripts the planner's routing reply, each agent's plan for SCENARIOS and FANOUT_SCENARIOS, and the memory summary."""
+    rules = [{"system": "running summary", "response": "The user asked arithmetic, word-count and astronomy questions."}]
+    rules += [
+        {"system": "You are a routing agent.", "user": prompt, "response": {"subtasks": subtasks}}
+        for prompt, subtasks in FANOUT_SCENARIOS
+    ]
+    rules += [
+        {"system": "You are a routing agent.", "user": prompt, "response": {"agent": name, "task": prompt}}
+        for name, prompt, _ in SCENARIOS
+    ]
+    rules += [{"user": prompt, "response": plan} for _, prompt, plan in SCENARIOS if plan is not None]
+    return ScriptedResponder(rules)
+
+class StageTimer:
+    """Accumulates time spent in the LLM, tools and logging by wrapping those calls."""
+
+    def __init__(self, client):
+        self.totals = {"llm": 0.0, "tools": 0.0, "logging": 0.0}
+        self._wrap(client.chat.completions, "create", "llm")
+        self._wrap(executor, "invoke_tool", "tools")
+        self._wrap(executor.logger, "log", "logging")
+
+    def _wrap(self, owner, name, stage):
+        fn = getattr(owner, name)
+
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self.totals[stage] += time.perf_counter() - start
+
+        setattr(owner, name, timed)
+
+    def reset(self):
+        for stage in self.totals:
+            self.totals[stage] = 0.0
+
+async def _monitor_loop_lag(samples, interval=0.001):
+    """Records how late the event loop wakes a task that sleeps for `interval` seconds."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+def _requests(level):
+    """Returns the async callables one request at this level may run, one per scenario (or tool)."""
+    calls = []
+    for name, prompt, plan in SCENARIOS:
+        if level == "router":
+            calls.append(lambda prompt=prompt: app.multi_agent_router(prompt))
+        elif level == "agent":
+            calls.append(lambda name=name, prompt=prompt: agent_registry[name](prompt, app.memory.session("default")))
+        elif level == "execute_plan" and plan is not None:
+            calls.append(lambda name=name, prompt=prompt: executor.execute_plan(prompt, agent=name))
+        elif level == "tool" and plan is not None:
+            for step in plan:
+                fn = agent_tools[name][step["tool"]]
+                previous = [16, 36, 49] if fn.batch else 42
+                args = [previous if a == "previous" else a for a in step["args"]]
+                calls.append(lambda fn=fn, args=args: executor.invoke_tool(fn, args))
+    if level == "router":
+        calls += [lambda prompt=prompt: app.multi_agent_router(prompt) for prompt, _ in FANOUT_SCENARIOS]
+    return calls
+
+async def run(level, concurrency, total, timer):
+    calls = _requests(level)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await calls[i % len(calls)]()
+                errors += isinstance(result, dict) and "error" in result
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    app.memory.session("default").clear()
+    timer.reset()
+    lag = []
+    monitor = asyncio.create_task(_monitor_loop_lag(lag))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - start
+    monitor.cancel()
+
+    mean_ms = sum(latencies) / total * 1000
+    stages = {stage: round(seconds / total * 1000, 3) for stage, seconds in timer.totals.items()}
+    stages["overhead"] = round(mean_ms - sum(stages.values()), 3)
+    return {
+        "level": level,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / wall, 1),
+        "latency_ms": {"mean": round(mean_ms, 3), **percentiles(latencies)},
+        "loop_lag_ms": {**percentiles(lag), "max": round(max(lag, default=0) * 1000, 3)},
+        "stage_ms": stages,
+    }
+
+def _slow_embedder(latency_ms):
+    """Makes every embedding call block its thread for latency_ms, as model inference would."""
+    from vector_store import get_embed_model
+    model = get_embed_model()
+    encode = model.encode
+
+    def slow_encode(*args, **kwargs):
+        time.sleep(latency_ms / 1000)
+        return encode(*args, **kwargs)
+
+    model.encode = slow_encode
+
+async def fanout_timing():
+    """Runs each FANOUT_SCENARIOS prompt once; returns wall time vs. slowest and summed sub-task time."""
+    from tools.rag_tools import search_cache
+    timings = []
+    for prompt, _ in FANOUT_SCENARIOS:
+        search_cache.clear()
+        app.memory.session("fanout-timing").clear()
+        result = await app.multi_agent_router(prompt, "fanout-timing")
+        durations = [s["duration_ms"] for s in result.get("subtasks", [])]
+        timings.append({
+            "prompt": prompt,
+            "wall_ms": result.get("wall_ms"),
+            "slowest_ms": max(durations, default=0),
+            "sum_ms": round(sum(durations), 3),
+            "errors": result.get("errors", result.get("error")),
+        })
+    return timings
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", nargs="+", default=list(LEVELS), choices=LEVELS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="requests per level and concurrency")
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--llm-jitter-ms", type=float, default=0)
+    parser.add_argument("--embed-latency-ms", type=float, default=0, help="blocking time added to each embedding call")
+    parser.add_argument("--out", default="e2e_benchmark.json")
+    args = parser.parse_args()
+
+    client = FakeChatClient(make_responder(), args.llm_latency_ms, args.llm_jitter_ms)
+    set_client(client)
+    timer = StageTimer(client)
+    executor.logger.path = os.path.join(_tmp.name, "agent_trace_log.jsonl")
+    with open(os.path.join(_tmp.name, "sample.txt"), "w") as f:
+        f.write("the quick brown fox jumps over the lazy dog\n" * 1000)
+    if config.TOOL_SANDBOX:
+        await get_sandbox().start()
+
+    results = []
+    # The agents print their plans and tool logs; keep them out of the report output.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        preload_knowledge_base()
+        if args.embed_latency_ms:
+            _slow_embedder(args.embed_latency_ms)
+        for level in args.levels:
+            for concurrency in args.concurrency:
+                results.append(await run(level, concurrency, args.requests, timer))
+        fanout = await fanout_timing() if "router" in args.levels else []
+
+    print(f"{'level':>12} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'lag p99':>8} "
+          f"{'llm':>7} {'tools':>7} {'log':>7} {'other':>7} {'errors':>6}")
+    for r in results:
+        latency, stages = r["latency_ms"], r["stage_ms"]
+        print(
+            f"{r['level']:>12} {r['concurrency']:>5} {r['throughput_rps']:>8.1f} {latency['p50']:>8.2f} "
+            f"{latency['p95']:>8.2f} {latency['p99']:>8.2f} {r['loop_lag_ms']['p99'] or 0:>8.2f} "
+            f"{stages['llm']:>7.2f} {stages['tools']:>7.2f} {stages['logging']:>7.2f} {stages['overhead']:>7.2f} {r['errors']:>6}"
+        )
+    if fanout:
+        print(f"\n{'fan-out wall ms':>16} {'slowest ms':>11} {'sum ms':>8}  prompt")
+        for f in fanout:
+            print(f"{f['wall_ms']:>16.2f} {f['slowest_ms']:>11.2f} {f['sum_ms']:>8.2f}  {f['prompt'][:50]}"
+                  + (f"  errors: {f['errors']}" if f["errors"] else ""))
+    write_report(args.out, "e2e", results, llm_calls=client.calls, fanout=fanout, **vars(args))
+    app.memory.close()
+    await executor.logger.close()
+    if config.TOOL_SANDBOX:
+        await get_sandbox().close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Compares verbose and lean plan modes on a fixed prompt set.
+
+For every prompt the math/string agent is run once per mode and the completion
+tokens and wall-clock latency of the planning call are recorded.
+
+Run from the project root:
+    python -m benchmarks.plan_mode_benchmark --repeats 3 --out plan_mode_benchmark.json
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import config
+import tools.math_tools
+import tools.string_tools
+from agents.math_agent import math_agent
+from agents.string_agent import string_agent
+from utils.llm import get_client
+
+PROMPTS = [
+    (math_agent, "Add 3 and 5"),
+    (math_agent, "Multiply 7 by 6 and then raise the result to the power of 2"),
+    (math_agent, "What is (12 + 8) * 3?"),
+    (math_agent, "Add 10 and 15, multiply by 4, then add 2"),
+    (string_agent, "How many words are in 'the quick brown fox jumps over the lazy dog'?"),
+    (string_agent, "Count the letters in 'hello world'"),
+]
+
+usage_log = []
+
+def _instrument_client():
+    """Wraps the shared chat completion call to capture usage and latency."""
+    client = get_client()
+    create = client.chat.completions.create
+
+    async def timed_create(*args, **kwargs):
+        start = time.perf_counter()
+        res = await create(*args, **kwargs)
+        usage_log.append({
+            "latency": time.perf_counter() - start,
+            "prompt_tokens": res.usage.prompt_tokens,
+            "completion_tokens": res.usage.completion_tokens,
+        })
+        return res
+
+    client.chat.completions.create = timed_create
+
+async def run_mode(mode, repeats):
+    config.PLAN_MODE = mode
+    rows = []
+    for agent_fn, prompt in PROMPTS:
+        for _ in range(repeats):
+            usage_log.clear()
+            result = await agent_fn(prompt, [])
+            call = usage_log[-1]
+            rows.append({"prompt": prompt, "ok": "error" not in result, **call})
+    return {
+        "mode": mode,
+        "runs": len(rows),
+        "errors": sum(not r["ok"] for r in rows),
+        "completion_tokens_mean": statistics.mean(r["completion_tokens"] for r in rows),
+        "prompt_tokens_mean": statistics.mean(r["prompt_tokens"] for r in rows),
+        "latency_mean": statistics.mean(r["latency"] for r in rows),
+        "latency_median": statistics.median(r["latency"] for r in rows),
+        "rows": rows,
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", default="plan_mode_benchmark.json")
+    args = parser.parse_args()
+
+    _instrument_client()
+    report = [await run_mode(mode, args.repeats) for mode in ("verbose", "lean")]
+
+    for r in report:
+        print(
+            f"{r['mode']:>8}: completion tokens {r['completion_tokens_mean']:.1f}, "
+            f"latency mean {r['latency_mean']:.2f}s / median {r['latency_median']:.2f}s, "
+            f"errors {r['errors']}/{r['runs']}"
+        )
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Measures memory, recall@k and latency of quantized indexes against exact search.
+
+Uses the same synthetic clustered data as ann_benchmark and compares
+QuantizedStore (int8 and binary, several rerank factors) with NumpyStore.
+Runs fully offline; no embedding model is loaded.
+
+Run from the project root:
+    python -m benchmarks.quantization_benchmark --n 200000 --rerank 1 4 10
+"""
+
+import argparse
+import os
+import tempfile
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+from benchmarks.ann_benchmark import make_dataset, recall_at_k, timed_queries
+from benchmarks.common import percentiles, write_report
+from vector_store.numpy_store import NumpyStore
+from vector_store.quantized_store import QuantizedStore
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=1000, help="clusters in the synthetic data")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[1, 2, 4, 10])
+    parser.add_argument("--out", default="quantization_benchmark.json")
+    args = parser.parse_args()
+
+    vectors, queries = make_dataset(args.n, args.dim, args.clusters, args.queries)
+    ids = [f"doc-{i}" for i in range(args.n)]
+    docs = [""] * args.n
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exact = NumpyStore(os.path.join(tmp, "exact"))
+        exact.add(ids, vectors, docs)
+        truth, latencies = timed_queries(exact, queries, args.top_k)
+        results = [{"index": "float32", "rerank": None, "scan_bytes": exact.matrix.nbytes, "recall": 1.0, **percentiles(latencies)}]
+
+        for quantization in ("int8", "binary"):
+            store = QuantizedStore(os.path.join(tmp, quantization), quantization)
+            store.add(ids, vectors, docs)
+            code_bytes, _ = store.memory_bytes()
+            for rerank in args.rerank:
+                found, latencies = timed_queries(store, queries, args.top_k, rerank=rerank)
+                results.append({
+                    "index": quantization,
+                    "rerank": rerank,
+                    "scan_bytes": code_bytes,
+                    "recall": round(recall_at_k(found, truth), 4),
+                    **percentiles(latencies),
+                })
+
+    print(f"{'index':>8} {'rerank':>6} {'scan MB':>8} {'shrink':>7} {'recall@' + str(args.top_k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        shrink = results[0]["scan_bytes"] / r["scan_bytes"]
+        print(
+            f"{r['index']:>8} {r['rerank'] or '-':>6} {r['scan_bytes'] / 2**20:>8.1f} {shrink:>6.1f}x "
+            f"{r['recall']:>10.4f} {r['p50']:>8.3f} {r['p95']:>8.3f}"
+        )
+    write_report(args.out, "quantization", results, **vars(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Measures retrieval quality and speed of the RAG stack across vector backends and top_k.
+
+Builds a corpus with labeled query -> relevant-doc pairs (synthetic, or loaded
+from JSONL files), ingests it into each backend through
+vector_store.add_documents, and runs every query through the same retrieval
+path as search_vector_db (dense or hybrid, without the result cache).
+Reports recall@k, MRR, p50/p95/p99 query latency, ingestion throughput, and
+index size on disk plus resident-memory growth per backend.
+
+Runs fully offline with the default "hash" embedder. Pass --embed torch / onnx
+to measure the real model when it is available locally.
+
+Corpus files (optional):
+    --corpus docs.jsonl       {"id": "...", "text": "...", "metadata": {...}} per line
+    --query-file queries.jsonl {"query": "...", "relevant": ["doc id", ...]} per line
+
+Run from the project root:
+    python -m benchmarks.rag_benchmark --docs 20000 --backends numpy ivf int8 binary chroma --top-k 1 5 10
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+import numpy as np
+
+import vector_store
+from benchmarks.common import percentiles, write_report
+from config import EMBED_MODEL_NAME, EMBED_ONNX_DIR, EMBED_THREADS
+from vector_store.embeddings import create_embedder
+
+BACKENDS = ("numpy", "ivf", "int8", "binary", "chroma")
+
+_SYLLABLES = [c + v for c in "bdfgklmnprstvz" for v in "aeiou"]
+
+def make_corpus(n_docs, n_queries, vocab=5000, topics=50, doc_len=40, query_len=5, seed=0):
+    """
+    Returns (ids, docs, metadatas, queries, relevant) for a synthetic corpus.
+
+    Every document mixes words from its topic with general words, both drawn
+    from Zipf-like distributions. Each query samples words from one document,
+    with one of them swapped for another word of the same topic; that document
+    is the query's relevant one.
+    """
+    rng = np.random.default_rng(seed)
+    words = sorted({"".join(rng.choice(_SYLLABLES, rng.integers(2, 5))) for _ in range(vocab * 2)})[:vocab]
+    words = [words[i] for i in rng.permutation(len(words))]
+    zipf = 1.0 / np.arange(1, len(words) + 1)
+    zipf /= zipf.sum()
+    topic_words = [rng.choice(len(words), 200, replace=False) for _ in range(topics)]
+    topic_zipf = 1.0 / np.arange(1, 201)
+    topic_zipf /= topic_zipf.sum()
+
+    ids, docs, metadatas, doc_words = [], [], [], []
+    for i in range(n_docs):
+        topic = int(rng.integers(topics))
+        n_topic = int(doc_len * 0.7)
+        chosen = list(topic_words[topic][rng.choice(200, n_topic, p=topic_zipf)])
+        chosen += list(rng.choice(len(words), doc_len - n_topic, p=zipf))
+        rng.shuffle(chosen)
+        ids.append(f"doc-{i}")
+        docs.append(" ".join(words[w] for w in chosen))
+        metadatas.append({"topic": f"topic-{topic}"})
+        doc_words.append((topic, sorted(set(chosen))))
+
+    queries, relevant = [], []
+    for target in rng.integers(n_docs, size=n_queries):
+        topic, distinct = doc_words[target]
+        picked = list(rng.choice(distinct, min(query_len, len(distinct)), replace=False))
+        picked[-1] = rng.choice(topic_words[topic])
+        queries.append(" ".join(words[w] for w in picked))
+        relevant.append({ids[target]})
+    return ids, docs, metadatas, queries, relevant
+
+def load_corpus(corpus_path, queries_path):
+    """Loads (ids, docs, metadatas, queries, relevant) from the JSONL files described above."""
+    ids, docs, metadatas, queries, relevant = [], [], [], [], []
+    with open(corpus_path) as f:
+        for line in f:
+            record = json.loads(line)
+            ids.append(record["id"])
+            docs.append(record["text"])
+            metadatas.append(record.get("metadata", {}))
+    with open(queries_path) as f:
+        for line in f:
+            record = json.loads(line)
+            queries.append(record["query"])
+            relevant.append(set(record["relevant"]))
+    return ids, docs, metadatas, queries, relevant
+
+def create_backend(name, path, nlist):
+    if name == "numpy":
+        from vector_store.numpy_store import NumpyStore
+        return NumpyStore(path)
+    if name == "ivf":
+        from vector_store.ivf_store import IVFStore
+        return IVFStore(path, nlist=nlist)
+    if name in ("int8", "binary"):
+        from vector_store.quantized_store import QuantizedStore
+        return QuantizedStore(path, name)
+    if name == "chroma":
+        from vector_store.chroma_store import ChromaStore
+        return ChromaStore(path, name="rag_benchmark")
+    raise ValueError(f"Unknown backend: {name}")
+
+def _activate(store, embedder):
+    """Points vector_store and rag_tools at the store under test, with a fresh BM25 index."""
+    vector_store._store = store
+    vector_store._embed_model = embedder
+    vector_store._lexical_index = None
+    # Imported here so it binds to the benchmark's store and embedder, not the configured ones.
+    from tools import rag_tools
+    rag_tools.store = store
+    rag_tools.embed_model = embedder
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def ingest(ids, docs, metadatas, batch_size):
+    """Adds the corpus through vector_store.add_documents and returns docs/s."""
+    start = time.perf_counter()
+    for i in range(0, len(ids), batch_size):
+        vector_store.add_documents(docs[i:i + batch_size], ids[i:i + batch_size], metadatas[i:i + batch_size])
+    return len(ids) / (time.perf_counter() - start)
+
+def evaluate(queries, relevant, top_k, hybrid):
+    """Runs each query on its own and returns (recall@k, MRR@k, latencies in seconds)."""
+    from tools import rag_tools
+    rag_tools.RAG_HYBRID = hybrid
+    recalls, reciprocal_ranks, latencies = [], [], []
+    for query, targets in zip(queries, relevant):
+        start = time.perf_counter()
+        found = rag_tools._search([query], top_k, None)[0]
+        latencies.append(time.perf_counter() - start)
+        ranked_ids = [_doc_ids[doc] for doc in found]
+        recalls.append(len(targets.intersection(ranked_ids)) / len(targets))
+        rank = next((r for r, doc_id in enumerate(ranked_ids, start=1) if doc_id in targets), None)
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+    return float(np.mean(recalls)), float(np.mean(reciprocal_ranks)), latencies
+
+# Document text -> id, as the retrieval path returns documents.
+_doc_ids = {}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10_000, help="synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200, help="synthetic query count")
+    parser.add_argument("--corpus", help="JSONL corpus file (overrides the synthetic corpus)")
+    parser.add_argument("--query-file", help="JSONL queries file, required with --corpus")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--modes", nargs="+", default=["hybrid", "dense"], choices=["hybrid", "dense"])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--embed", default="hash", help='embedding backend: "hash" (offline), "torch", "onnx" or "onnx-int8"')
+    parser.add_argument("--nlist", type=int, default=64, help="IVF clusters")
+    parser.add_argument("--batch-size", type=int, default=256, help="documents per add_documents call")
+    parser.add_argument("--out", default="rag_benchmark.json")
+    args = parser.parse_args()
+
+    if args.corpus:
+        if not args.query_file:
+            parser.error("--query-file is required with --corpus")
+        ids, docs, metadatas, queries, relevant = load_corpus(args.corpus, args.query_file)
+    else:
+        ids, docs, metadatas, queries, relevant = make_corpus(args.docs, args.queries)
+    _doc_ids.update(zip(docs, ids))
+    embedder = create_embedder(args.embed, EMBED_MODEL_NAME, EMBED_THREADS, EMBED_ONNX_DIR)
+
+    results, ingestion = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            path = os.path.join(tmp, backend)
+            rss_before = _rss_bytes()
+            _activate(create_backend(backend, path, args.nlist), embedder)
+            docs_per_second = ingest(ids, docs, metadatas, args.batch_size)
+            build_seconds = None
+            if backend == "ivf":
+                start = time.perf_counter()
+                vector_store._store.build()
+                build_seconds = round(time.perf_counter() - start, 3)
+            vector_store.get_lexical_index()
+            rss_after = _rss_bytes()
+            ingestion.append({
+                "backend": backend,
+                "docs_per_second": round(docs_per_second, 1),
+                "build_seconds": build_seconds,
+                "disk_bytes": _dir_bytes(path),
+                "rss_growth_bytes": rss_after - rss_before if rss_before is not None else None,
+            })
+            for mode in args.modes:
+                for top_k in args.top_k:
+                    recall, mrr, latencies = evaluate(queries, relevant, top_k, mode == "hybrid")
+                    results.append({
+                        "backend": backend, "mode": mode, "top_k": top_k,
+                        "recall": round(recall, 4), "mrr": round(mrr, 4), **percentiles(latencies),
+                    })
+            _activate(None, None)
+
+    print(f"{'backend':>8} {'docs/s':>9} {'build s':>8} {'disk MB':>8} {'RSS +MB':>8}")
+    for r in ingestion:
+        rss = f"{r['rss_growth_bytes'] / 1e6:8.1f}" if r["rss_growth_bytes"] is not None else f"{'-':>8}"
+        print(f"{r['backend']:>8} {r['docs_per_second']:>9.0f} {r['build_seconds'] or '-':>8} {r['disk_bytes'] / 1e6:>8.1f} {rss}")
+    print(f"\n{'backend':>8} {'mode':>6} {'top_k':>5} {'recall':>7} {'MRR':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for r in results:
+        print(
+            f"{r['backend']:>8} {r['mode']:>6} {r['top_k']:>5} {r['recall']:>7.4f} {r['mrr']:>7.4f} "
+            f"{r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f}"
+        )
+    write_report(
+        args.out, "rag", results, ingestion=ingestion, corpus_size=len(ids), query_count=len(queries), **vars(args)
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Replays a recorded session offline through multi_agent_router.
+
+Record a session with the real model:
+    LLM_CASSETTE_MODE=record LLM_CASSETTE=session.jsonl python main.py
+
+then replay it: every prompt that reached the planner is sent through the
+router again in the original order, and every LLM call is answered from the
+cassette (optionally after its recorded latency). Tools, retrieval and the
+framework run for real, so the report shows where time goes without the
+model's variance. Reports per-prompt latency, replay hits/misses and totals.
+Conversation memory starts empty in both runs (MEMORY_BACKEND defaults to
+"memory" while a cassette is in use), so the planner prompts match.
+
+Run from the project root:
+    python -m benchmarks.replay_benchmark session.jsonl --realtime --out replay_benchmark.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+# Planner prompts include conversation memory, so replay from an empty memory
+# like the recording did; anything persisted would change every request hash.
+os.environ["MEMORY_BACKEND"] = "memory"
+
+import config
+import main as app
+from benchmarks.common import percentiles, write_report
+from utils.cassette import ReplayClient
+from utils.llm import set_client
+
+def session_prompts(client):
+    """Returns the user prompts of the recorded planner calls, in recording order."""
+    prompts = []
+    for record in client.records:
+        messages = record["request"]["messages"]
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        if system.startswith("You are a routing agent."):
+            prompts.append(next(m["content"] for m in reversed(messages) if m["role"] == "user"))
+    return prompts
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("cassette")
+    parser.add_argument("--realtime", action="store_true", help="wait each call's recorded latency")
+    parser.add_argument("--speed", type=float, default=1.0, help="divide recorded latencies by this factor")
+    parser.add_argument("--out", default="replay_benchmark.json")
+    args = parser.parse_args()
+
+    client = ReplayClient(args.cassette, realtime=args.realtime, speed=args.speed)
+    set_client(client)
+    # Makes the router wait for background summaries, as it did while recording.
+    config.LLM_CASSETTE_MODE = "replay"
+    recorded_ms = sum(record["latency_ms"] for record in client.records)
+
+    results = []
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for prompt in session_prompts(client):
+            prompt_start = time.perf_counter()
+            try:
+                result = await app.multi_agent_router(prompt)
+                error = result.get("error") if isinstance(result, dict) else None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            results.append({"prompt": prompt, "latency_ms": round((time.perf_counter() - prompt_start) * 1000, 3), "error": error})
+    total_ms = (time.perf_counter() - start) * 1000
+
+    for r in results:
+        print(f"{r['latency_ms']:>10.2f} ms  {'ERROR ' if r['error'] else ''}{r['prompt'][:70]}")
+    print(
+        f"\n{len(results)} prompts in {total_ms:.1f} ms (recorded LLM time {recorded_ms:.1f} ms), "
+        f"replay hits {client.hits}, misses {client.misses}"
+    )
+    latency = percentiles([r["latency_ms"] / 1000 for r in results])
+    write_report(
+        args.out, "replay", results,
+        total_ms=round(total_ms, 3), recorded_llm_ms=round(recorded_ms, 3), latency_ms=latency,
+        hits=client.hits, misses=client.misses, **vars(args),
+    )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,3 +8,128 @@ assert OPENAI_API_KEY is not None, "❌ OPENAI_API_KEY is not set!"
 
 CHROMA_DB_PATH = "./chroma_rag"
 EMBED_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Embedding backend: "torch" (SentenceTransformer), or "onnx" / "onnx-int8" to
+# run the copy exported by `python -m rag_setup.export_onnx` with ONNX Runtime.
+# EMBED_THREADS caps inference threads (0 = library default). "hash" is an
+# offline word-hashing embedder for benchmarks, with no semantic similarity.
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+EMBED_ONNX_DIR = os.getenv("EMBED_ONNX_DIR", "./onnx_model")
+EMBED_THREADS = int(os.getenv("EMBED_THREADS", "0"))
+
+# Opt-in shared embedding server (`python -m vector_store.embed_server`). When
+# set and the socket exists, encoding goes to the server instead of loading
+# the model in every process; otherwise it falls back to in-process encoding.
+EMBED_SERVER_SOCKET = os.getenv("EMBED_SERVER_SOCKET", "")
+
+# Vector store backend: "chroma" (CHROMA_DB_PATH), or one of the in-process
+# indexes kept under VECTOR_INDEX_PATH: "numpy" (exact, memory-mapped) or
+# "ivf" (approximate; IVF_NLIST clusters, IVF_NPROBE of them searched per query).
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "./vector_index")
+IVF_NLIST = int(os.getenv("IVF_NLIST", "256"))
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+
+# Optional compact codes for the "numpy" backend: "int8" or "binary". Queries
+# scan the codes, then rerank VECTOR_RERANK * top_k candidates at full precision.
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "")
+VECTOR_RERANK = int(os.getenv("VECTOR_RERANK", "4"))
+
+# Hybrid retrieval: BM25 and dense results (RAG_CANDIDATES * top_k of each)
+# are combined with reciprocal rank fusion.
+RAG_HYBRID = os.getenv("RAG_HYBRID", "1") == "1"
+RAG_CANDIDATES = int(os.getenv("RAG_CANDIDATES", "4"))
+RRF_K = 60
+
+# LRU cache of search_vector_db results (0 disables). Entries are dropped
+# whenever documents are added or deleted through vector_store.
+RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "1024"))
+
+# Hits whose token-set Jaccard similarity to a better hit reaches
+# RAG_DEDUP_THRESHOLD are dropped (1 disables). RAG_MAX_TOKENS caps the
+# tokens of documents returned per query (0 = no limit).
+RAG_DEDUP_THRESHOLD = float(os.getenv("RAG_DEDUP_THRESHOLD", "0.9"))
+RAG_MAX_TOKENS = int(os.getenv("RAG_MAX_TOKENS", "0"))
+
+# LLM client: "openai", or "fake" to answer offline from the JSON script at
+# FAKE_LLM_SCRIPT (see utils/llm.py) after FAKE_LLM_LATENCY_MS.
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+FAKE_LLM_SCRIPT = os.getenv("FAKE_LLM_SCRIPT", "")
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+
+# LLM cassette (utils/cassette.py): "record" appends every call to LLM_CASSETTE,
+# "replay" answers from it offline, waiting the recorded latency if
+# LLM_REPLAY_REALTIME=1.
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "")
+LLM_CASSETTE = os.getenv("LLM_CASSETTE", "llm_cassette.jsonl")
+LLM_REPLAY_REALTIME = os.getenv("LLM_REPLAY_REALTIME", "0") == "1"
+
+# Hierarchical tracing spans (router -> planner -> agent -> execute_plan -> llm/tool),
+# appended to TRACE_PATH as JSONL when TRACING=1. Convert with `python -m utils.tracing`.
+# Off by default: the file is not rotated, and metrics receive spans either way.
+TRACING = os.getenv("TRACING", "0") == "1"
+TRACE_PATH = os.getenv("TRACE_PATH", "agent_spans.jsonl")
+
+# Conversation memory (memory_store/): "sqlite" persists every entry to
+# MEMORY_DB (WAL mode, written on a background thread); "memory" keeps nothing
+# across restarts. Each session keeps its last MEMORY_RING_SIZE entries in
+# memory, and at most MEMORY_MAX_SESSIONS sessions are cached. While recording or
+# replaying an LLM cassette the default is "memory", so every session starts
+# empty and the planner prompts match the recording.
+MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "memory" if LLM_CASSETTE_MODE else "sqlite")
+MEMORY_DB = os.getenv("MEMORY_DB", "agent_memory.db")
+MEMORY_RING_SIZE = int(os.getenv("MEMORY_RING_SIZE", "50"))
+MEMORY_MAX_SESSIONS = int(os.getenv("MEMORY_MAX_SESSIONS", "1000"))
+
+# Semantic recall: memory prompts are embedded when written. The planner shows
+# the latest entry plus the MEMORY_CONTEXT_K most similar ones scoring at least
+# MEMORY_MIN_SCORE (cosine), within MEMORY_CONTEXT_TOKENS tokens.
+MEMORY_SEMANTIC = os.getenv("MEMORY_SEMANTIC", "1") == "1"
+MEMORY_CONTEXT_K = int(os.getenv("MEMORY_CONTEXT_K", "5"))
+MEMORY_CONTEXT_TOKENS = int(os.getenv("MEMORY_CONTEXT_TOKENS", "500"))
+MEMORY_MIN_SCORE = float(os.getenv("MEMORY_MIN_SCORE", "0.3"))
+
+# Planner context (memory_store/context.py): each remembered prompt/result is
+# cut to MEMORY_RESULT_TOKENS. Once MEMORY_SUMMARY_BATCH turns are not yet
+# summarized, a background task folds them into a rolling summary of at most
+# MEMORY_SUMMARY_TOKENS using the cheaper SUMMARY_MODEL (0 disables).
+MEMORY_RESULT_TOKENS = int(os.getenv("MEMORY_RESULT_TOKENS", "60"))
+MEMORY_SUMMARY_BATCH = int(os.getenv("MEMORY_SUMMARY_BATCH", "10"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "150"))
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o-mini")
+
+# agent_trace_log.jsonl is rotated into gzip segments with a sidecar index
+# (utils/logger.py) once it reaches TRACE_LOG_MAX_BYTES or its first record is
+# TRACE_LOG_MAX_SECONDS old; 0 disables either limit.
+TRACE_LOG_MAX_BYTES = int(os.getenv("TRACE_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_LOG_MAX_SECONDS = float(os.getenv("TRACE_LOG_MAX_SECONDS", "86400"))
+
+# Metrics (utils/metrics.py): exposed at GET /metrics in server mode
+# (`python main.py --serve`); the CLI rewrites METRICS_DUMP_PATH every
+# METRICS_DUMP_INTERVAL seconds (0 disables the dump).
+METRICS = os.getenv("METRICS", "1") == "1"
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "60"))
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH", "metrics.prom")
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+
+# Per-request profiling (utils/profiling.py): PROFILE=1 profiles every request;
+# otherwise use `python main.py --profile` or an `X-Profile: 1` header in server
+# mode. Reports are written to PROFILE_DIR with PROFILE_TOP rows per section.
+PROFILE = os.getenv("PROFILE", "0") == "1"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "30"))
+
+# "verbose" plans carry a reasoning string per step; "lean" plans are compact
+# positional arrays like ["add", 2, 3] that cut the tokens the model generates.
+PLAN_MODE = os.getenv("PLAN_MODE", "verbose")
+
+# File-based tools (e.g. word_count_file) may only read below this directory.
+FILE_TOOLS_ROOT = os.getenv("FILE_TOOLS_ROOT", ".")
+
+# Run tools marked isolate=True (e.g. power, evaluate) in a pool of worker
+# processes with per-call CPU-time and memory limits.
+TOOL_SANDBOX = os.getenv("TOOL_SANDBOX", "0") == "1"
+SANDBOX_WORKERS = int(os.getenv("SANDBOX_WORKERS", "2"))
+SANDBOX_CPU_SECONDS = int(os.getenv("SANDBOX_CPU_SECONDS", "2"))
+SANDBOX_MEMORY_MB = int(os.getenv("SANDBOX_MEMORY_MB", "1024"))
@@ -5,12 +5,22 @@ import tools.rag_tools
 # Now import agents
 from agents import math_agent, string_agent, rag_agent, memory_agent, planner_agent
 
+import argparse
 import asyncio
 import json
 from agents.planner_agent import planner_agent
 from agents import math_agent, string_agent, rag_agent, memory_agent
+import config
+from config import TOOL_SANDBOX
+from memory_store import get_memory_store
+from memory_store.context import schedule_summary, wait_for_summary
+from utils import metrics
+from utils.executor import logger
+from utils.fanout import run_subtasks
+from utils.sandbox import get_sandbox
+from utils.tracing import span
 
-memory_log = []
+memory = get_memory_store()
 
 agent_registry = {
     "planner": planner_agent,
@@ -20,28 +30,89 @@ agent_registry = {
     "memory": memory_agent.memory_agent,
 }
 
-async def multi_agent_router(prompt):
-    plan = await planner_agent(prompt, memory_log)
-    agent_name = plan.get("agent")
-    task = plan.get("task")
+async def multi_agent_router(prompt, session_id="default"):
+    metrics.IN_FLIGHT.inc()
+    try:
+        return await _route(prompt, memory.session(session_id))
+    finally:
+        metrics.IN_FLIGHT.dec()
 
-    if agent_name not in agent_registry:
-        return {"error": f"Unknown agent: {agent_name}"}
+async def _route(prompt, memory_log):
+    if config.LLM_CASSETTE_MODE:
+        # Recorded and replayed planner prompts must see the same rolling summary.
+        await wait_for_summary(memory_log)
+    with span("router", prompt=prompt) as s:
+        plan = await planner_agent(prompt, memory_log)
 
-    result = await agent_registry[agent_name](task, memory_log)
+        if "subtasks" in plan:
+            # Compound prompt: run the sub-tasks concurrently and merge their results.
+            agent_name = "fanout"
+            s.set(agent=agent_name)
+            result = await run_subtasks(plan["subtasks"], memory_log, agent_registry)
+            if "error" in result:
+                s.fail(result["error"])
+                return result
+        else:
+            agent_name = plan.get("agent")
+            task = plan.get("task")
+            s.set(agent=agent_name)
 
-    if agent_name != "planner" and isinstance(result, dict) and "result" in result:
-        memory_log.append((prompt, result["result"]))
+            if agent_name not in agent_registry:
+                s.fail(f"Unknown agent: {agent_name}")
+                return {"error": f"Unknown agent: {agent_name}"}
 
-    return result
+            result = await agent_registry[agent_name](task, memory_log)
+
+        if agent_name != "planner" and isinstance(result, dict):
+            if "result" in result:
+                await memory_log.add(prompt, result["result"])
+            elif "final_result" in result:
+                await memory_log.add(prompt, result["final_result"])
+            schedule_summary(memory_log)
+
+        return result
 
 async def main():
-    while True:
-        prompt = input("\nAsk something (or type 'exit'): ")
-        if prompt.lower() == "exit":
-            break
-        result = await multi_agent_router(prompt)
-        print(json.dumps(result, indent=2))
+    parser = argparse.ArgumentParser(description="Multi-agent assistant.")
+    parser.add_argument("--serve", action="store_true", help="run the HTTP server instead of the interactive prompt")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--profile", action="store_true", default=config.PROFILE,
+                        help="profile every request with cProfile and tracemalloc (see utils/profiling.py)")
+    args = parser.parse_args()
+
+    if TOOL_SANDBOX:
+        await get_sandbox().start()
+    if args.serve:
+        from server import AgentServer
+        try:
+            await AgentServer(multi_agent_router, profile=args.profile).serve(args.host, args.port)
+        finally:
+            memory.close()
+            await logger.close()
+        return
+
+    dumper = None
+    if config.METRICS and config.METRICS_DUMP_INTERVAL > 0:
+        dumper = asyncio.create_task(metrics.dump_periodically())
+    try:
+        while True:
+            # Read in a thread so the metrics dump keeps running while waiting for input.
+            prompt = await asyncio.to_thread(input, "\nAsk something (or type 'exit'): ")
+            if prompt.lower() == "exit":
+                break
+            if args.profile:
+                from utils.profiling import profile_call
+                result, _ = await profile_call(multi_agent_router, prompt)
+            else:
+                result = await multi_agent_router(prompt)
+            print(json.dumps(result, indent=2))
+    finally:
+        memory.close()
+        await logger.close()
+        if dumper is not None:
+            dumper.cancel()
+            metrics.dump()
 
 if __name__ == "__main__":
     asyncio.run(main())
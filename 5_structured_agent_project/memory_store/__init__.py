@@ -0,0 +1,201 @@
+"""
+Per-session conversation memory.
+
+Each session keeps its latest MEMORY_RING_SIZE entries in a bounded ring, and
+at most MEMORY_MAX_SESSIONS sessions stay in memory (least recently used are
+dropped), so a long-running server keeps flat memory use. With
+MEMORY_BACKEND=sqlite every entry is also written to MEMORY_DB on a background
+thread, and a session that was dropped or belongs to a previous run is
+reloaded from there on its next use.
+
+With MEMORY_SEMANTIC on, each entry's prompt is embedded when it is written
+(with the shared embedder from vector_store) and the embeddings of a session's
+ring form its vector index, searched with one matmul by SessionMemory.search.
+
+Each session also carries a rolling summary of its older turns, maintained in
+the background by memory_store/context.py.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from config import MEMORY_BACKEND, MEMORY_DB, MEMORY_RING_SIZE, MEMORY_MAX_SESSIONS, MEMORY_SEMANTIC
+
+class MemoryEntry:
+    """One question and the result it got. Unpacks like the old (prompt, result) tuples."""
+    __slots__ = ("prompt", "result", "timestamp", "embedding")
+
+    def __init__(self, prompt, result, timestamp=None, embedding=None):
+        self.prompt = prompt
+        self.result = result
+        self.timestamp = timestamp or time.time()
+        self.embedding = embedding
+
+    def __iter__(self):
+        return iter((self.prompt, self.result))
+
+def _encode(text):
+    from vector_store import get_embed_model
+    vector = np.asarray(get_embed_model().encode([text]), dtype=np.float32).reshape(-1)
+    return vector / max(np.linalg.norm(vector), 1e-12)
+
+class SessionMemory:
+    """
+    The memory of one session: a ring of its most recent entries, oldest first.
+
+    Supports len(), iteration and indexing like the list it replaces.
+
+    Args:
+        session_id (str): Session the entries belong to.
+        size (int): Entries kept in memory.
+        backend (optional): Persistent backend, e.g. SQLiteBackend.
+    """
+
+    def __init__(self, session_id, size, backend=None):
+        self.session_id = session_id
+        self.backend = backend
+        entries = backend.load(session_id, size) if backend else []
+        self._ring = deque(entries, maxlen=size)
+        self._index = None
+        self._last_embedding = (None, None)
+        # Summary of every turn up to summarized_until (an entry timestamp).
+        self.summary, self.summarized_until = backend.load_summary(session_id) if backend else ("", 0.0)
+
+    def __len__(self):
+        return len(self._ring)
+
+    def __iter__(self):
+        return iter(self._ring)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._ring)[index]
+        return self._ring[index]
+
+    def append(self, prompt, result, embedding=None):
+        entry = MemoryEntry(prompt, result, embedding=embedding)
+        self._ring.append(entry)
+        self._index = None
+        if self.backend:
+            self.backend.append(self.session_id, entry)
+        return entry
+
+    async def add(self, prompt, result):
+        """Appends an entry, embedding its prompt first when MEMORY_SEMANTIC is on."""
+        embedding = await self.embed(prompt) if MEMORY_SEMANTIC else None
+        return self.append(prompt, result, embedding)
+
+    async def embed(self, text):
+        """Embeds text off the event loop. The last text is remembered, so the planner's
+        query embedding is reused when the same prompt is stored afterwards."""
+        cached_text, vector = self._last_embedding
+        if text != cached_text:
+            vector = await asyncio.to_thread(_encode, text)
+            self._last_embedding = (text, vector)
+        return vector
+
+    def _vectors(self):
+        if self._index is None:
+            entries = [e for e in self._ring if e.embedding is not None]
+            matrix = np.stack([e.embedding for e in entries]) if entries else None
+            self._index = (entries, matrix)
+        return self._index
+
+    async def search(self, query, k=3, min_score=0.0):
+        """Returns up to k (score, entry) pairs whose prompts are most similar to query, best first."""
+        if not MEMORY_SEMANTIC:
+            return []
+        entries, matrix = self._vectors()
+        if matrix is None:
+            return []
+        vector = await self.embed(query)
+        if len(vector) != matrix.shape[1]:  # entries from a different embedding model
+            return []
+        scores = matrix @ vector
+        best = np.argsort(-scores)[:k]
+        return [(float(scores[i]), entries[i]) for i in best if scores[i] >= min_score]
+
+    async def relevant(self, query, k, min_score=0.0):
+        """
+        Returns the entries worth showing for query: the most recent entry
+        (for follow-ups like "now double it"), then the k most similar ones.
+        Without MEMORY_SEMANTIC, the k most recent entries, newest first.
+        """
+        if not MEMORY_SEMANTIC:
+            return self.recent(k)[::-1]
+        picked = self.recent(1)
+        for _, entry in await self.search(query, k, min_score):
+            if entry not in picked:
+                picked.append(entry)
+        return picked
+
+    def unsummarized(self):
+        """Entries newer than the rolling summary, oldest first."""
+        return [e for e in self._ring if e.timestamp > self.summarized_until]
+
+    def set_summary(self, summary, until):
+        self.summary, self.summarized_until = summary, until
+        if self.backend:
+            self.backend.save_summary(self.session_id, summary, until)
+
+    def recent(self, n):
+        """Returns the last n entries, oldest first."""
+        return list(self._ring)[-n:] if n > 0 else []
+
+    def clear(self):
+        self._ring.clear()
+        self._index = None
+        self.summary, self.summarized_until = "", 0.0
+        if self.backend:
+            self.backend.clear(self.session_id)
+
+class MemoryStore:
+    """
+    Hands out SessionMemory objects, keeping the most recently used sessions cached.
+
+    Args:
+        backend (optional): Persistent backend shared by all sessions, or None for memory only.
+        ring_size (int): Entries kept in memory per session.
+        max_sessions (int): Sessions kept in memory.
+    """
+
+    def __init__(self, backend=None, ring_size=MEMORY_RING_SIZE, max_sessions=MEMORY_MAX_SESSIONS):
+        self.backend = backend
+        self.ring_size = ring_size
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+
+    def session(self, session_id):
+        memory = self._sessions.get(session_id)
+        if memory is None:
+            memory = self._sessions[session_id] = SessionMemory(session_id, self.ring_size, self.backend)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return memory
+
+    def close(self):
+        """Waits for pending writes to reach the backend."""
+        if self.backend:
+            self.backend.close()
+
+def create_memory_store(backend):
+    """Creates the MemoryStore for a backend name from config.py."""
+    if backend == "sqlite":
+        from memory_store.sqlite_backend import SQLiteBackend
+        return MemoryStore(SQLiteBackend(MEMORY_DB))
+    if backend == "memory":
+        return MemoryStore()
+    raise ValueError(f"Unknown memory backend: {backend}")
+
+_memory_store = None
+
+def get_memory_store():
+    global _memory_store
+    if _memory_store is None:
+        _memory_store = create_memory_store(MEMORY_BACKEND)
+    return _memory_store
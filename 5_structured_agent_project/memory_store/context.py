@@ -0,0 +1,90 @@
+"""
+Token-budgeted memory context for the planner, plus rolling summaries.
+
+build_context renders a session's memory into at most MEMORY_CONTEXT_TOKENS
+tokens: the rolling summary of older turns first, then the latest and the
+most relevant entries, each prompt and result cut to MEMORY_RESULT_TOKENS
+(long lists are shown as their size plus their first items).
+
+schedule_summary is called after a turn is stored. Once MEMORY_SUMMARY_BATCH
+turns are newer than the summary, it folds them into the summary with
+SUMMARY_MODEL on a background task, so requests never wait for it. A failed
+summarisation keeps the old summary and is retried after the next turn.
+While an LLM cassette is recorded or replayed, the router calls
+wait_for_summary before each turn, so the summary is always in place at the
+same turn and the planner prompts hash the same in both runs.
+"""
+
+import asyncio
+import json
+
+from config import (
+    MEMORY_CONTEXT_K, MEMORY_CONTEXT_TOKENS, MEMORY_MIN_SCORE, MEMORY_RESULT_TOKENS,
+    MEMORY_SUMMARY_BATCH, MEMORY_SUMMARY_TOKENS, SUMMARY_MODEL,
+)
+from utils.tokens import count_tokens, pack, truncate_tokens
+from utils.tracing import span
+
+# Running summarisation tasks by session id (also keeps them from being garbage collected).
+_tasks = {}
+
+def elide(value, max_tokens=MEMORY_RESULT_TOKENS):
+    """Renders a prompt or result as text of at most about max_tokens tokens."""
+    text = value if isinstance(value, str) else json.dumps(value, default=str)
+    if count_tokens(text) <= max_tokens:
+        return text
+    prefix = f"({len(value)} items) " if isinstance(value, (list, tuple, dict)) else ""
+    return prefix + truncate_tokens(text, max_tokens) + " …"
+
+async def build_context(memory_log, query, max_tokens=MEMORY_CONTEXT_TOKENS):
+    """Returns the memory block for a planner prompt about query, within max_tokens."""
+    lines = []
+    if memory_log.summary:
+        lines.append("Summary of earlier turns: " + truncate_tokens(memory_log.summary, min(MEMORY_SUMMARY_TOKENS, max_tokens)))
+    budget = max_tokens - sum(count_tokens(line) for line in lines)
+    entries = await memory_log.relevant(query, MEMORY_CONTEXT_K, MEMORY_MIN_SCORE)
+    if entries and budget > 0:
+        lines += pack([f"- {elide(e.prompt)} → {elide(e.result)}" for e in entries], budget)
+    return "\n".join(lines) or "No history."
+
+async def summarize(memory_log):
+    """Folds the session's unsummarized turns into its rolling summary."""
+    from utils.llm import complete
+
+    entries = memory_log.unsummarized()
+    if not entries:
+        return
+    turns = "\n".join(f"- {elide(e.prompt)} → {elide(e.result)}" for e in entries)
+    words = int(MEMORY_SUMMARY_TOKENS * 0.75)
+    with span("summarize", new_trace=True, session=memory_log.session_id, turns=len(entries)):
+        response = await complete([
+            {"role": "system", "content": (
+                "You maintain a running summary of a conversation between a user and an assistant.\n"
+                "Merge the new turns into the summary. Keep facts, numbers, names and open questions.\n"
+                f"Reply with the updated summary only, in at most {words} words."
+            )},
+            {"role": "user", "content": f"Summary so far:\n{memory_log.summary or '(none)'}\n\nNew turns:\n{turns}"},
+        ], model=SUMMARY_MODEL, agent="summarizer")
+    summary = truncate_tokens(response.choices[0].message.content.strip(), MEMORY_SUMMARY_TOKENS)
+    memory_log.set_summary(summary, entries[-1].timestamp)
+
+def schedule_summary(memory_log):
+    """Starts a background summarisation if enough turns are pending and none is running for the session."""
+    if MEMORY_SUMMARY_BATCH <= 0 or memory_log.session_id in _tasks:
+        return
+    if len(memory_log.unsummarized()) < MEMORY_SUMMARY_BATCH:
+        return
+    task = asyncio.create_task(summarize(memory_log))
+    _tasks[memory_log.session_id] = task
+    task.add_done_callback(lambda t: _finish(memory_log.session_id, t))
+
+async def wait_for_summary(memory_log):
+    """Waits for the session's running summarisation, if any."""
+    task = _tasks.get(memory_log.session_id)
+    if task is not None:
+        await asyncio.gather(task, return_exceptions=True)
+
+def _finish(session_id, task):
+    _tasks.pop(session_id, None)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[SUMMARY] {session_id}: {type(task.exception()).__name__}: {task.exception()}")
@@ -0,0 +1,116 @@
+"""
+SQLite persistence for conversation memory.
+
+Writes are queued and applied by one background thread in batched
+transactions, so requests never wait on disk. The database runs in WAL mode,
+so loading a session on the event loop does not block on the writer.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+
+import numpy as np
+
+from memory_store import MemoryEntry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    session TEXT NOT NULL,
+    ts REAL NOT NULL,
+    prompt TEXT NOT NULL,
+    result TEXT,
+    embedding BLOB
+);
+CREATE INDEX IF NOT EXISTS memory_session_ts ON memory (session, ts);
+CREATE TABLE IF NOT EXISTS summaries (
+    session TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    until_ts REAL NOT NULL
+);
+"""
+
+class SQLiteBackend:
+    """
+    Stores memory entries in an SQLite database.
+
+    Args:
+        path (str): Database file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(memory)")]
+            if "embedding" not in columns:
+                conn.execute("ALTER TABLE memory ADD COLUMN embedding BLOB")
+        conn.close()
+        self._reader = None
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="memory-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, session_id, entry):
+        result = json.dumps(entry.result, default=str)
+        embedding = entry.embedding.astype(np.float32).tobytes() if entry.embedding is not None else None
+        self._queue.put((
+            "INSERT INTO memory (session, ts, prompt, result, embedding) VALUES (?, ?, ?, ?, ?)",
+            (session_id, entry.timestamp, entry.prompt, result, embedding),
+        ))
+
+    def clear(self, session_id):
+        self._queue.put(("DELETE FROM memory WHERE session = ?", (session_id,)))
+        self._queue.put(("DELETE FROM summaries WHERE session = ?", (session_id,)))
+
+    def save_summary(self, session_id, summary, until):
+        self._queue.put(("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)", (session_id, summary, until)))
+
+    def _read(self, sql, params):
+        if self._reader is None:
+            self._reader = sqlite3.connect(self.path)
+        return self._reader.execute(sql, params).fetchall()
+
+    def load_summary(self, session_id):
+        """Returns (summary, until timestamp), or ("", 0.0) if the session has none."""
+        rows = self._read("SELECT summary, until_ts FROM summaries WHERE session = ?", (session_id,))
+        return rows[0] if rows else ("", 0.0)
+
+    def load(self, session_id, limit):
+        """Returns the session's latest `limit` entries, oldest first."""
+        rows = self._read(
+            "SELECT prompt, result, ts, embedding FROM memory WHERE session = ? ORDER BY ts DESC LIMIT ?", (session_id, limit)
+        )
+        return [
+            MemoryEntry(prompt, json.loads(result), ts, np.frombuffer(embedding, dtype=np.float32) if embedding else None)
+            for prompt, result, ts, embedding in reversed(rows)
+        ]
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        while True:
+            batch = [self._queue.get()]
+            while not self._queue.empty() and batch[-1] is not None:
+                batch.append(self._queue.get())
+            with conn:
+                for item in batch:
+                    if item is not None:
+                        conn.execute(*item)
+            if batch[-1] is None:
+                conn.close()
+                return
+
+    def pending_writes(self):
+        return self._queue.qsize()
+
+    def close(self):
+        """Applies all queued writes and stops the writer thread."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
@@ -0,0 +1,18 @@
+import argparse
+from config import IVF_NLIST
+from vector_store import get_store
+from vector_store.ivf_store import IVFStore
+
+def build_ivf_index(nlist=IVF_NLIST, iterations=10):
+    store = get_store()
+    if not isinstance(store, IVFStore):
+        raise SystemExit("❌ Set VECTOR_BACKEND=ivf to build an IVF index.")
+    store.build(nlist=nlist, iterations=iterations)
+    print(f"✅ Built IVF index with {store.nlist} clusters over {store.count()} documents.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="(Re)build the IVF index over the vector store.")
+    parser.add_argument("--nlist", type=int, default=IVF_NLIST)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    build_ivf_index(args.nlist, args.iterations)
@@ -0,0 +1,111 @@
+import argparse
+import os
+import time
+
+import numpy as np
+from config import EMBED_MODEL_NAME, EMBED_ONNX_DIR
+from vector_store.embeddings import OnnxEmbedder
+
+PARITY_SENTENCES = [
+    "The sun is a star at the center of the solar system.",
+    "Planets orbit the sun due to gravity.",
+    "What orbits the Earth?",
+    "ERR_CODE_42 is raised when the disk is full",
+    "short",
+    "A much longer sentence that keeps going so the batch contains inputs of very different lengths, "
+    "which exercises padding, attention masks and mean pooling over the real tokens only.",
+]
+
+# Minimum cosine similarity between PyTorch and ONNX embeddings of the same sentence.
+PARITY_THRESHOLDS = {False: 0.9999, True: 0.99}
+
+def export_onnx(model, out_dir=EMBED_ONNX_DIR, quantize=True):
+    """Exports a SentenceTransformer's transformer and tokenizer, plus an int8-quantized copy."""
+    import torch
+
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer.backend_tokenizer.save(os.path.join(out_dir, "tokenizer.json"))
+
+    sample = tokenizer(["An example sentence."], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(names, inputs))).last_hidden_state
+
+    path = os.path.join(out_dir, "model.onnx")
+    axes = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(), tuple(sample[name] for name in names), path,
+            input_names=names, output_names=["last_hidden_state"],
+            dynamic_axes={name: axes for name in names + ["last_hidden_state"]},
+            opset_version=17, dynamo=False,
+        )
+    print(f"✅ Exported {path}")
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantized_path = os.path.join(out_dir, "model_quantized.onnx")
+        quantize_dynamic(path, quantized_path, weight_type=QuantType.QInt8)
+        print(f"✅ Quantized {quantized_path}")
+
+def _throughput(encode, sentences, repeats=3):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        encode(sentences)
+    return repeats * len(sentences) / (time.perf_counter() - start)
+
+def _query_latency(encode, repeats=20):
+    encode(PARITY_SENTENCES[2])
+    start = time.perf_counter()
+    for _ in range(repeats):
+        encode(PARITY_SENTENCES[2])
+    return (time.perf_counter() - start) / repeats * 1000
+
+def check_parity(model, out_dir=EMBED_ONNX_DIR, quantized=False, threads=None):
+    """
+    Compares ONNX embeddings with the PyTorch ones on PARITY_SENTENCES.
+
+    Prints cosine similarity, single-query latency and batch throughput of both
+    backends, and returns True if every sentence meets PARITY_THRESHOLDS.
+    """
+    onnx_model = OnnxEmbedder(out_dir, threads, quantized=quantized)
+    reference = model.encode(PARITY_SENTENCES, normalize_embeddings=True)
+    candidate = onnx_model.encode(PARITY_SENTENCES)
+    cosine = (reference * candidate).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    threshold = PARITY_THRESHOLDS[quantized]
+    label = "onnx-int8" if quantized else "onnx"
+    ok = bool(cosine.min() >= threshold)
+    print(f"{'✅' if ok else '❌'} {label} parity: min cosine {cosine.min():.6f}, mean {cosine.mean():.6f} (threshold {threshold})")
+
+    batch = PARITY_SENTENCES * 32
+    for name, encode in (("torch", model.encode), (label, onnx_model.encode)):
+        print(f"   {name:>9}: query {_query_latency(encode):.2f} ms, ingestion {_throughput(encode, batch):.0f} sentences/s")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX and check it against PyTorch.")
+    parser.add_argument("--model", default=EMBED_MODEL_NAME)
+    parser.add_argument("--out", default=EMBED_ONNX_DIR)
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8-quantized copy")
+    parser.add_argument("--check-only", action="store_true", help="only run the parity check on an existing export")
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(args.model, device="cpu")
+    if not args.check_only:
+        export_onnx(model, args.out, quantize=not args.no_quantize)
+    results = [check_parity(model, args.out, quantized=False, threads=args.threads)]
+    if os.path.exists(os.path.join(args.out, "model_quantized.onnx")):
+        results.append(check_parity(model, args.out, quantized=True, threads=args.threads))
+    if not all(results):
+        raise SystemExit(1)
@@ -1,16 +1,15 @@
-from vector_store import rag_collection, embed_model
+from vector_store import add_documents
 
 def preload_knowledge_base():
     docs = [
-        "The sun is a star at the center of the solar system.",
-        "Planets orbit the sun due to gravity.",
-        "Stars generate energy through nuclear fusion.",
-        "The Earth is the third planet from the sun.",
-        "The moon orbits the Earth and affects tides.",
+        ("The sun is a star at the center of the solar system.", {"topic": "sun"}),
+        ("Planets orbit the sun due to gravity.", {"topic": "planets"}),
+        ("Stars generate energy through nuclear fusion.", {"topic": "stars"}),
+        ("The Earth is the third planet from the sun.", {"topic": "planets"}),
+        ("The moon orbits the Earth and affects tides.", {"topic": "moon"}),
     ]
     ids = [f"doc-{i}" for i in range(len(docs))]
-    embeddings = embed_model.encode(docs).tolist()
-    rag_collection.add(documents=docs, embeddings=embeddings, ids=ids)
+    add_documents([doc for doc, _ in docs], ids, [{"source": "preload", **meta} for _, meta in docs])
     print(f"✅ Preloaded {len(docs)} documents into RAG DB.")
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+"""
+Minimal asyncio HTTP/1.1 server for running the agents as a service.
+
+Routes:
+    POST /ask       {"prompt": "...", "session": "..."} -> the router's JSON result
+    GET  /metrics   Prometheus text (utils/metrics.py)
+    GET  /health    "ok"
+
+The session (conversation memory) comes from the body's "session" field or an
+`X-Session-Id` header and defaults to "default". Connections are kept alive between requests unless the client sends
+`Connection: close`. A request with an `X-Profile: 1` header (or every request
+when started with --profile) is profiled with utils/profiling.py; its response
+carries the report's trace id in `X-Trace-Id`. Started with `python main.py --serve`.
+"""
+
+import asyncio
+import json
+
+from utils.metrics import registry
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+async def _read_request(reader):
+    """Returns (method, path, headers, body), or None when the client has closed the connection."""
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, headers, body
+
+def _response(status, body, content_type="application/json", keep_alive=True, headers=None):
+    if not isinstance(body, bytes):
+        body = body.encode()
+    extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    head = (
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n{extra}\r\n"
+    )
+    return head.encode() + body
+
+class AgentServer:
+    """
+    Serves `router(prompt, session_id)` (e.g. main.multi_agent_router) over HTTP.
+
+    Args:
+        router (callable): Async function taking a prompt and session id and returning a JSON-serialisable result.
+        profile (bool): Profile every request, not just those sent with `X-Profile: 1`.
+    """
+
+    def __init__(self, router, profile=False):
+        self.router = router
+        self.profile = profile
+
+    async def handle(self, method, path, headers, body):
+        """Returns (status, body, content type, extra headers) for one request."""
+        if path == "/metrics":
+            return 200, registry.render(), "text/plain; version=0.0.4", {}
+        if path == "/health":
+            return 200, "ok", "text/plain", {}
+        if path != "/ask":
+            return 404, json.dumps({"error": f"No route for {path}"}), "application/json", {}
+        if method != "POST":
+            return 405, json.dumps({"error": "Use POST"}), "application/json", {}
+        try:
+            request = json.loads(body)
+            prompt = request["prompt"]
+            session_id = str(request.get("session") or headers.get("x-session-id") or "default")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return 400, json.dumps({"error": 'Body must be JSON like {"prompt": "..."}'}), "application/json", {}
+
+        extra = {}
+        try:
+            if self.profile or headers.get("x-profile") == "1":
+                from utils.profiling import profile_call
+                result, extra["X-Trace-Id"] = await profile_call(self.router, prompt, session_id)
+            else:
+                result = await self.router(prompt, session_id)
+        except Exception as e:
+            return 500, json.dumps({"error": f"{type(e).__name__}: {e}"}), "application/json", extra
+        return 200, json.dumps(result, default=str), "application/json", extra
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, content, content_type, extra = await self.handle(method, path.split("?", 1)[0], headers, body)
+                writer.write(_response(status, content, content_type, keep_alive, extra))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self._connection, host, port)
+        print(f"✅ Serving on http://{host}:{port} (POST /ask, GET /metrics)")
+        async with server:
+            await server.serve_forever()
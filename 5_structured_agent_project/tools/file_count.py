@@ -0,0 +1,90 @@
+"""
+Streaming word/letter counting for the file tools in tools/string_tools.py.
+
+This module only uses the standard library, so the worker processes that
+word_count_file / letter_count_file start for `workers > 1` stay small:
+    python -m tools.file_count <path> <start> <end>
+prints the (words, letters) of bytes [start, end) as JSON. They are started
+directly rather than through multiprocessing, which would re-import main.py
+(and with it the agents, Chroma and the memory store) in every worker.
+"""
+
+import codecs
+import json
+import mmap
+import os
+import subprocess
+import sys
+
+# Files are read at most CHUNK_SIZE bytes at a time, so memory stays flat
+# however large the file is.
+CHUNK_SIZE = 1 << 20
+
+# Every byte that is not an ASCII letter; deleting these with bytes.translate
+# leaves only the letters of an ASCII string.
+_NOT_LETTER_BYTES = bytes(b for b in range(256) if not (65 <= b <= 90 or 97 <= b <= 122))
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def count_letters(s):
+    if s.isascii():
+        return len(s.encode("ascii").translate(None, _NOT_LETTER_BYTES))
+    return sum(c.isalpha() for c in s)
+
+def count_range(path, start, end):
+    """Counts (words, letters) in bytes [start, end) of a file via mmap."""
+    words = letters = 0
+    in_word = False
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for offset in range(start, end, CHUNK_SIZE):
+            text = decoder.decode(mm[offset:min(offset + CHUNK_SIZE, end)], final=offset + CHUNK_SIZE >= end)
+            if not text:
+                continue
+            words += len(text.split())
+            # A word split across the chunk boundary was counted in both chunks.
+            if in_word and not text[0].isspace():
+                words -= 1
+            in_word = not text[-1].isspace()
+            letters += count_letters(text)
+    return words, letters
+
+def split_ranges(path, size, parts):
+    """Splits a file into byte ranges that end on newlines, so no word or character straddles two ranges."""
+    bounds = [0]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, parts):
+            newline = mm.find(b"\n", max(bounds[-1], size * i // parts))
+            if newline == -1:
+                break
+            bounds.append(newline + 1)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+def count_file(path, workers=1):
+    """Counts (words, letters) in a whole file, split across up to `workers` processes."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0, 0
+    ranges = split_ranges(path, size, workers) if workers > 1 else [(0, size)]
+    if len(ranges) == 1:
+        return count_range(path, 0, size)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PROJECT_ROOT, env.get("PYTHONPATH")]))
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "tools.file_count", path, str(start), str(end)],
+            stdout=subprocess.PIPE, env=env,
+        )
+        for start, end in ranges
+    ]
+    counts = []
+    for process in processes:
+        out, _ = process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"File count worker exited with code {process.returncode}")
+        counts.append(json.loads(out))
+    return sum(w for w, _ in counts), sum(l for _, l in counts)
+
+if __name__ == "__main__":
+    print(json.dumps(count_range(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))))
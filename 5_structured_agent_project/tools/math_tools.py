@@ -1,5 +1,74 @@
+import ast
+import functools
+import math
+import numbers
+import operator
+
+import numpy as np
+
 from utils.decorators import tool
 
+# Limits that keep power and evaluate cheap: exponents are capped, and any
+# intermediate result larger than MAX_RESULT_BITS bits is rejected.
+MAX_EXPONENT = 10_000
+MAX_RESULT_BITS = 4096
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: None,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+def _check_magnitude(value):
+    if isinstance(value, numbers.Integral):
+        value = int(value)
+        if value.bit_length() > MAX_RESULT_BITS:
+            raise ValueError(f"Result exceeds {MAX_RESULT_BITS} bits")
+    elif isinstance(value, numbers.Real):
+        if not math.isfinite(value):
+            raise ValueError("Result is not a finite number")
+    else:
+        raise ValueError(f"Result is not a real number: {value}")
+    return value
+
+def _safe_pow(a, b):
+    # NumPy integers would wrap around silently; Python ints do not.
+    a, b = (int(x) if isinstance(x, numbers.Integral) else x for x in (a, b))
+    if abs(b) > MAX_EXPONENT:
+        raise ValueError(f"Exponent {b} exceeds limit of {MAX_EXPONENT}")
+    if isinstance(a, int) and isinstance(b, int) and b > 0 and abs(a) > 1:
+        # Estimate the result size before computing it.
+        if a.bit_length() * b > MAX_RESULT_BITS + b:
+            raise ValueError(f"Result exceeds {MAX_RESULT_BITS} bits")
+    return a ** b
+
+def _compile(node):
+    """Compiles a whitelisted AST node into a closure."""
+    if isinstance(node, ast.Expression):
+        return _compile(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = _check_magnitude(node.value)
+        return lambda: value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+        left, right = _compile(node.left), _compile(node.right)
+        op = _BINARY_OPS[type(node.op)] or _safe_pow
+        return lambda: _check_magnitude(op(left(), right()))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        operand = _compile(node.operand)
+        op = _UNARY_OPS[type(node.op)]
+        return lambda: op(operand())
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+@functools.lru_cache(maxsize=256)
+def _compile_expression(expression):
+    tree = ast.parse(expression.replace("^", "**"), mode="eval")
+    return _compile(tree)
+
 @tool(agent="math")
 def add(a, b):
     """
@@ -28,7 +97,7 @@ def multiply(a, b):
     """
     return a * b
 
-@tool(agent="math")
+@tool(agent="math", isolate=True)
 def power(a, b):
     """
     Raises a number to the power of another number.
@@ -40,4 +109,106 @@ def power(a, b):
     Returns:
         int or float: The result of raising the base to the given exponent.
     """
-    return a ** b
+    return _check_magnitude(_safe_pow(a, b))
+
+@tool(agent="math", isolate=True)
+def evaluate(expression):
+    """
+    Evaluates a whole arithmetic expression in one step, e.g. "(3+5)*2^4".
+
+    Supports numbers, parentheses, +, -, *, /, //, % and ^ (or **) for powers.
+    Prefer this over chaining add/multiply/power for anything with more than one operator.
+
+    Args:
+        expression (str): The arithmetic expression to evaluate.
+
+    Returns:
+        int or float: The value of the expression.
+    """
+    return _compile_expression(expression.strip())()
+
+def _exact(arrays, limit):
+    """
+    Returns the operands ready for integer-safe NumPy arithmetic.
+
+    Integer arrays stay int64 when limit(largest magnitudes) fits in int64;
+    otherwise they become object arrays of Python ints, which cannot overflow.
+    """
+    arrays = [np.asarray(a) for a in arrays]
+    if not all(a.dtype.kind in "iub" for a in arrays):
+        return arrays
+    magnitudes = [max(abs(int(a.max())), abs(int(a.min()))) if a.size else 0 for a in arrays]
+    if limit(*magnitudes) < 2**63:
+        return arrays
+    return [a.astype(object) for a in arrays]
+
+def _checked(result):
+    """Applies the evaluate size limits to object-array results."""
+    if isinstance(result, np.ndarray) and result.dtype == object:
+        for value in result.flat:
+            _check_magnitude(value)
+    return result
+
+@tool(agent="math", batch=True)
+def batch_add(a, b):
+    """
+    Adds numbers element-wise across whole lists in one step.
+
+    Args:
+        a (list or number): The first list of numbers (or a single number to broadcast).
+        b (list or number): The second list of numbers (or a single number to broadcast).
+
+    Returns:
+        list: The element-wise sums.
+    """
+    return _checked(np.add(*_exact([a, b], lambda x, y: x + y)))
+
+@tool(agent="math", batch=True)
+def batch_multiply(a, b):
+    """
+    Multiplies numbers element-wise across whole lists in one step.
+
+    Args:
+        a (list or number): The first list of numbers (or a single number to broadcast).
+        b (list or number): The second list of numbers (or a single number to broadcast).
+
+    Returns:
+        list: The element-wise products.
+    """
+    return _checked(np.multiply(*_exact([a, b], lambda x, y: x * y)))
+
+@tool(agent="math", batch=True, isolate=True)
+def batch_power(a, b):
+    """
+    Raises numbers to powers element-wise across whole lists in one step.
+
+    Args:
+        a (list or number): The base numbers (or a single base to broadcast).
+        b (list or number): The exponents (or a single exponent to broadcast).
+
+    Returns:
+        list: The element-wise powers, as floats.
+    """
+    exponents = np.asarray(b, dtype=np.float64)
+    if exponents.size and np.abs(exponents).max() > MAX_EXPONENT:
+        raise ValueError(f"Exponent exceeds limit of {MAX_EXPONENT}")
+    with np.errstate(over="ignore", invalid="ignore"):
+        result = np.power(np.asarray(a, dtype=np.float64), exponents)
+    if not np.isfinite(result).all():
+        raise ValueError("Result is not a finite number")
+    return result
+
+@tool(agent="math", batch=True)
+def batch_sum(values):
+    """
+    Sums a whole list of numbers in one step.
+
+    Args:
+        values (list): The numbers to sum.
+
+    Returns:
+        int or float: The total.
+    """
+    (values,) = _exact([values], lambda x: x * max(np.size(values), 1))
+    total = values.sum()
+    return _check_magnitude(total.item() if isinstance(total, np.generic) else total)
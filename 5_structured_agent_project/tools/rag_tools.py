@@ -1,10 +1,134 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import RAG_HYBRID, RAG_CANDIDATES, RRF_K, RAG_CACHE_SIZE, RAG_DEDUP_THRESHOLD, RAG_MAX_TOKENS
+from utils.bm25 import tokenize
+from utils.cache import LRUCache
 from utils.decorators import tool
-from vector_store import rag_collection, embed_model
-
-@tool(agent="rag")
-def search_vector_db(query, top_k=3):
-    """Searches the vector DB for relevant documents."""
-    query_embedding = embed_model.encode(query).tolist()
-    results = rag_collection.query(query_embeddings=[query_embedding], n_results=top_k)
-    docs = results["documents"][0] if "documents" in results else []
-    return docs
+from utils.metrics import register_cache
+from utils.tokens import pack
+from vector_store import store, embed_model, get_lexical_index, get_version
+from vector_store.filters import matches
+
+# Dense and lexical retrieval run side by side on these threads, two per search;
+# searches from concurrent sub-tasks each run on their own worker thread.
+_retrievers = ThreadPoolExecutor(max_workers=8, thread_name_prefix="retriever")
+
+# Per-stage latencies (ms) of the most recently finished search.
+last_timings = {}
+
+# (normalized query, top_k, where) -> documents, invalidated when the collection changes.
+# See search_cache.stats() for the hit rate.
+search_cache = LRUCache(RAG_CACHE_SIZE)
+register_cache("rag_search", search_cache)
+
+def normalize_query(query):
+    # The embedding model and BM25 are both case-insensitive.
+    return " ".join(query.lower().split())
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+def _dense_search(queries, n, where):
+    """Encodes all queries in one batch and runs them as one multi-embedding store query."""
+    embeddings = embed_model.encode(queries)
+    results = store.query(embeddings, n, where=where)
+    return [list(zip(ids, docs)) for ids, docs in zip(results["ids"], results["documents"])]
+
+def _lexical_search(queries, n, where):
+    index = get_lexical_index()
+    accept = (lambda doc_id: matches(index.metadatas[doc_id], where)) if where else None
+    return [
+        [(doc_id, index.documents[doc_id]) for doc_id, _ in index.search(query, n, accept)]
+        for query in queries
+    ]
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Fuses ranked (id, doc) lists: each hit scores sum(1 / (k + rank)) over the lists it appears in."""
+    scores, docs = {}, {}
+    for ranking in rankings:
+        for rank, (doc_id, doc) in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+            docs[doc_id] = doc
+    return [docs[doc_id] for doc_id in sorted(scores, key=scores.get, reverse=True)]
+
+def suppress_near_duplicates(docs, threshold=RAG_DEDUP_THRESHOLD):
+    """Drops documents whose token-set Jaccard similarity to a better-ranked one is >= threshold."""
+    if threshold >= 1:
+        return list(docs)
+    kept, kept_terms = [], []
+    for doc in docs:
+        terms = set(tokenize(doc))
+        if all(len(terms & other) < threshold * len(terms | other) for other in kept_terms):
+            kept.append(doc)
+            kept_terms.append(terms)
+    return kept
+
+def _search(queries, top_k, where, timings):
+    """
+    Retrieves top_k documents for each query, with one encode and one store query for all of them.
+    RAG_CANDIDATES * top_k candidates are fetched so near-duplicates can be dropped without coming up short.
+    """
+    n = top_k * RAG_CANDIDATES
+    if not RAG_HYBRID:
+        dense, timings["dense_ms"] = _timed(_dense_search, queries, n, where)
+        rankings = [[doc for _, doc in hits] for hits in dense]
+    else:
+        dense = _retrievers.submit(_timed, _dense_search, queries, n, where)
+        lexical = _retrievers.submit(_timed, _lexical_search, queries, n, where)
+        (dense, timings["dense_ms"]), (lexical, timings["lexical_ms"]) = dense.result(), lexical.result()
+        rankings, timings["fusion_ms"] = _timed(
+            lambda: [reciprocal_rank_fusion(pair) for pair in zip(dense, lexical)]
+        )
+    results, timings["dedup_ms"] = _timed(
+        lambda: [suppress_near_duplicates(docs)[:top_k] for docs in rankings]
+    )
+    return results
+
+def _union(results):
+    """Merges per-query results rank by rank (every query's best hit first), dropping duplicates."""
+    seen, merged = set(), []
+    for rank in range(max(map(len, results), default=0)):
+        for docs in results:
+            if rank < len(docs) and docs[rank] not in seen:
+                seen.add(docs[rank])
+                merged.append(docs[rank])
+    return merged
+
+@tool(agent="rag", batch=True, blocking=True)
+def search_vector_db(query, top_k=3, union=False, where=None, max_tokens=None):
+    """
+    Searches the vector DB for relevant documents. `query` may be a list of queries,
+    searched together in one call: returns one list of documents per query, or with
+    union=true {"results": [...], "union": [deduplicated documents across all queries]}.
+    `where` filters on document metadata, e.g. {"topic": "planets"}. Results are packed
+    into max_tokens tokens (default RAG_MAX_TOKENS, 0 = no limit).
+    """
+    global last_timings
+    start = time.perf_counter()
+    timings = {}
+    queries = [query] if isinstance(query, str) else list(query)
+    max_tokens = RAG_MAX_TOKENS if max_tokens is None else max_tokens
+    version = get_version()
+    where_key = json.dumps(where, sort_keys=True) if where else None
+    keys = [(normalize_query(q), top_k, where_key) for q in queries]
+    results = [search_cache.get(key, version) for key in keys]
+    misses = [i for i, docs in enumerate(results) if docs is None]
+    if misses:
+        for i, docs in zip(misses, _search([queries[i] for i in misses], top_k, where, timings)):
+            search_cache.put(keys[i], list(docs), version)
+            results[i] = docs
+    results = [pack(docs, max_tokens) if max_tokens else list(docs) for docs in results]
+    timings["total_ms"] = (time.perf_counter() - start) * 1000
+    last_timings = timings
+    hits = len(queries) - len(misses)
+    print("[RAG TIMINGS]", {stage: round(ms, 2) for stage, ms in timings.items()}, f"cache hits {hits}/{len(queries)}")
+    if isinstance(query, str):
+        return results[0]
+    if union:
+        merged = _union(results)
+        return {"results": results, "union": pack(merged, max_tokens) if max_tokens else merged}
+    return results
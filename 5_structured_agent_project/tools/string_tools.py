@@ -1,3 +1,9 @@
+import os
+
+import numpy as np
+
+from config import FILE_TOOLS_ROOT
+from tools.file_count import count_file, count_letters
 from utils.decorators import tool
 
 @tool(agent="string")
@@ -22,4 +28,71 @@ def letter_count(s):
     Returns:
         int: The total count of alphabetic characters in the string.
     """
-    return sum(c.isalpha() for c in s)
+    return count_letters(s)
+
+@tool(agent="string", batch=True)
+def batch_word_count(strings):
+    """Calculates the number of words in each string of a list in one step.
+
+    Args:
+        strings (list of str): The input strings to analyze.
+
+    Returns:
+        list of int: The word count of each string.
+    """
+    return np.fromiter((len(s.split()) for s in strings), dtype=np.int64, count=len(strings))
+
+@tool(agent="string", batch=True)
+def batch_letter_count(strings):
+    """Calculates the number of alphabetic characters in each string of a list in one step.
+
+    Args:
+        strings (list of str): The input strings to analyze.
+
+    Returns:
+        list of int: The letter count of each string.
+    """
+    return np.fromiter((count_letters(s) for s in strings), dtype=np.int64, count=len(strings))
+
+def _resolve_path(path):
+    """Resolves a plan-supplied path, refusing anything outside FILE_TOOLS_ROOT."""
+    root = os.path.realpath(FILE_TOOLS_ROOT)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise ValueError(f"Path is outside the allowed directory: {path}")
+    return full
+
+def _count_file(path, workers):
+    # workers comes from the plan: accept "4", and never start more processes than CPUs.
+    workers = max(1, min(int(workers), os.cpu_count() or 1))
+    return count_file(_resolve_path(path), workers)
+
+@tool(agent="string", blocking=True)
+def word_count_file(path, workers=1):
+    """Calculates the number of words in a text file, streaming it so any file size works.
+
+    Pass the file path instead of the file contents.
+
+    Args:
+        path (str): Path to the text file.
+        workers (int, optional): Number of processes to split the file across (at most the CPU count). Defaults to 1.
+
+    Returns:
+        int: The total count of words in the file.
+    """
+    return _count_file(path, workers)[0]
+
+@tool(agent="string", blocking=True)
+def letter_count_file(path, workers=1):
+    """Calculates the number of alphabetic characters in a text file, streaming it so any file size works.
+
+    Pass the file path instead of the file contents.
+
+    Args:
+        path (str): Path to the text file.
+        workers (int, optional): Number of processes to split the file across (at most the CPU count). Defaults to 1.
+
+    Returns:
+        int: The total count of alphabetic characters in the file.
+    """
+    return _count_file(path, workers)[1]
@@ -0,0 +1,81 @@
+"""
+In-process BM25 index used for the lexical half of hybrid retrieval.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+_TOKEN = re.compile(r"\w+")
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+class BM25Index:
+    """
+    Inverted index scored with Okapi BM25.
+
+    Args:
+        k1 (float): Term-frequency saturation.
+        b (float): Document-length normalization.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)   # term -> {doc_id: term frequency}
+        self.doc_lengths = {}               # doc_id -> number of tokens
+        self.documents = {}                 # doc_id -> text
+        self.metadatas = {}                 # doc_id -> metadata dict
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def add(self, ids, docs, metadatas=None):
+        for doc_id, doc, metadata in zip(ids, docs, metadatas or [{}] * len(ids)):
+            if doc_id in self.doc_lengths:
+                self.remove([doc_id])
+            terms = Counter(tokenize(doc))
+            for term, tf in terms.items():
+                self.postings[term][doc_id] = tf
+            length = sum(terms.values())
+            self.doc_lengths[doc_id] = length
+            self.documents[doc_id] = doc
+            self.metadatas[doc_id] = metadata or {}
+            self.total_length += length
+
+    def remove(self, ids):
+        for doc_id in ids:
+            if doc_id not in self.doc_lengths:
+                continue
+            self.metadatas.pop(doc_id, None)
+            for term in set(tokenize(self.documents.pop(doc_id))):
+                postings = self.postings[term]
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+            self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(self, query, top_k=10, accept=None):
+        """
+        Returns up to top_k (doc_id, score) pairs, best first.
+
+        accept (callable, optional): Called with a doc_id; only docs it returns True for are ranked.
+        """
+        n = len(self.doc_lengths)
+        if n == 0:
+            return []
+        avg_length = self.total_length / n
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        hits = scores.items() if accept is None else ((doc_id, s) for doc_id, s in scores.items() if accept(doc_id))
+        return heapq.nlargest(top_k, hits, key=lambda item: item[1])
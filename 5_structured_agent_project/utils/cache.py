@@ -0,0 +1,72 @@
+"""
+Size-bounded LRU cache with hit-rate counters and version-based invalidation.
+"""
+
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Least-recently-used cache tied to a data version.
+
+    Every lookup passes the current version of the underlying data; when it
+    differs from the version the entries were stored under, the cache is
+    cleared first, so results never outlive a change to the data.
+
+    Args:
+        maxsize (int): Maximum number of entries. 0 disables caching.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.version = None
+        self.hits = self.misses = self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _check_version(self, version):
+        if version != self.version:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self.version = version
+
+    def get(self, key, version):
+        """Returns the cached value for key, or None on a miss."""
+        with self._lock:
+            self._check_version(version)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value, version):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            # The data changed while the value was being computed.
+            if version != self.version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,103 @@
+"""
+Record/replay of LLM calls.
+
+A cassette is a JSONL file with one chat completion per line: the request,
+its hash, the response content and usage, and how long the call took.
+RecordingClient appends to it while passing calls through to a real client;
+ReplayClient serves the recorded responses back without network access.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from types import SimpleNamespace
+
+from utils.llm import make_response
+
+def request_key(model, messages, **kwargs):
+    """Hashes a chat completion request; identical requests get identical keys."""
+    payload = json.dumps({"model": model, "messages": messages, **kwargs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _usage(response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+class RecordingClient:
+    """
+    Passes chat completions through to `inner` and appends each one to the cassette.
+
+    Args:
+        inner: Client to record, e.g. AsyncOpenAI.
+        path (str): Cassette file, appended to.
+    """
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.path = path
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        start = time.perf_counter()
+        response = await self.inner.chat.completions.create(model=model, messages=messages, **kwargs)
+        latency_ms = (time.perf_counter() - start) * 1000
+        record = {
+            "key": request_key(model, messages, **kwargs),
+            "recorded_at": datetime.utcnow().isoformat(),
+            "latency_ms": round(latency_ms, 3),
+            "request": {"model": model, "messages": messages, **kwargs},
+            "response": {"content": response.choices[0].message.content, "usage": _usage(response)},
+        }
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+        return response
+
+class ReplayClient:
+    """
+    Serves chat completions from a cassette.
+
+    Requests are matched by request_key. A request recorded several times is
+    answered with its recordings in order, then keeps repeating the last one.
+    A request that was never recorded raises LookupError.
+
+    Args:
+        path (str): Cassette file.
+        realtime (bool): Wait each call's recorded latency before answering.
+        speed (float): Divides the recorded latency when realtime is on.
+    """
+
+    def __init__(self, path, realtime=False, speed=1.0):
+        self.path = path
+        self.realtime = realtime
+        self.speed = speed
+        self.records = []
+        self._by_key = defaultdict(deque)
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                self.records.append(record)
+                self._by_key[record["key"]].append(record)
+        self.hits = self.misses = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        recordings = self._by_key.get(request_key(model, messages, **kwargs))
+        if not recordings:
+            self.misses += 1
+            user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+            raise LookupError(f"No recorded LLM response for request: {user[:80]!r}")
+        self.hits += 1
+        record = recordings.popleft() if len(recordings) > 1 else recordings[0]
+        if self.realtime:
+            await asyncio.sleep(record["latency_ms"] / 1000 / self.speed)
+        usage = record["response"]["usage"] or {"prompt_tokens": 0, "completion_tokens": 0}
+        return make_response(record["response"]["content"], model, usage["prompt_tokens"], usage["completion_tokens"])
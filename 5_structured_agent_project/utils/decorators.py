@@ -1,16 +1,38 @@
+import functools
+
+from utils.tracing import span
+
 tool_registry = {}
 agent_tools = {}
 agent_registry = {}
 
 def agent(name):
+    """Registers an agent; each call runs inside an "agent:<name>" tracing span."""
     def decorator(fn):
-        agent_registry[name] = fn
-        return fn
+        @functools.wraps(fn)
+        async def traced(*args, **kwargs):
+            with span(f"agent:{name}"):
+                return await fn(*args, **kwargs)
+        agent_registry[name] = traced
+        return traced
     return decorator
 
-def tool(agent=None):
+def tool(agent=None, batch=False, isolate=False, blocking=False):
+    """
+    Registers a tool, optionally for a specific agent.
+
+    Tools marked batch=True take whole lists/arrays; other tools are applied
+    element-wise by execute_plan when a "previous" argument is an array.
+    Tools marked isolate=True can be costly and run in the process sandbox
+    when TOOL_SANDBOX is enabled. Tools marked blocking=True (e.g. file scans)
+    run in a worker thread so they do not stall the event loop; all others run
+    inline.
+    """
     def decorator(fn):
         name = fn.__name__
+        fn.batch = batch
+        fn.isolate = isolate
+        fn.blocking = blocking
         if agent:
             agent_tools.setdefault(agent, {})[name] = fn
         else:
@@ -1,40 +1,141 @@
+import asyncio
 import json
-from openai import AsyncOpenAI
-from config import OPENAI_API_KEY
+import numpy as np
+import config
+from utils.llm import complete
 from utils.logger import Logger
+from utils.metrics import PARSE_FAILURES
 from utils.decorators import agent_tools, tool_registry
+from utils.sandbox import get_sandbox
+from utils.tracing import span
 
 logger = Logger()
-client = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
-async def execute_plan(user_prompt, agent=None, system_msg=None):
+def plan_format(examples, mode=None):
+    """
+    Builds the plan-format instructions for a system prompt.
+
+    Args:
+        examples (list): (tool, args, reasoning) tuples used to show the format.
+        mode (str, optional): "verbose" or "lean". Defaults to config.PLAN_MODE.
+
+    Returns:
+        str: Instructions telling the model how to lay out its plan.
+    """
+    mode = mode or config.PLAN_MODE
+    if mode == "lean":
+        rows = ",\n".join(f"  {json.dumps([name, *args])}" for name, args, _ in examples)
+        return (
+            "Return ONLY a JSON list of steps, one [tool, arg1, arg2, ...] array per step, like:\n"
+            f"[\n{rows}\n]\n"
+            "Do not explain the steps."
+        )
+    rows = ",\n".join(
+        f"  {json.dumps({'tool': name, 'args': args, 'reasoning': reasoning})}"
+        for name, args, reasoning in examples
+    )
+    return (
+        "Return a list of tool calls like:\n"
+        f"[\n{rows}\n]\n"
+        "IMPORTANT: Always include a 'reasoning' field explaining why this tool is being called."
+    )
+
+def expand_plan(plan):
+    """
+    Expands a plan into the verbose step structure used for logging.
+
+    Lean steps ["add", 2, 3] become {"tool": "add", "args": [2, 3], "reasoning": ""};
+    verbose steps are passed through unchanged. A single step sent without the
+    outer list is treated as a one-step plan; anything else raises ValueError.
+    """
+    if isinstance(plan, dict) or (isinstance(plan, list) and plan and isinstance(plan[0], str)):
+        plan = [plan]
+    if not isinstance(plan, list):
+        raise ValueError(f"Plan must be a list of tool calls, got {type(plan).__name__}")
+    steps = []
+    for step in plan:
+        if isinstance(step, list) and step:
+            steps.append({"tool": step[0], "args": step[1:], "reasoning": ""})
+        elif isinstance(step, dict) and "tool" in step:
+            steps.append(step)
+        else:
+            raise ValueError(f"Malformed plan step: {step!r}")
+    return steps
+
+def to_json(value):
+    """Converts NumPy results into plain Python values for logging and output."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, list):
+        return [to_json(v) for v in value]
+    return value
+
+async def invoke_tool(fn, args):
+    """
+    Runs a tool inline, in the process sandbox if it is marked isolate=True and
+    TOOL_SANDBOX is on, or in a worker thread if it is marked blocking=True.
+    """
+    if fn.isolate and config.TOOL_SANDBOX:
+        return await get_sandbox().run(fn, *args)
+    if fn.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+async def call_tool(fn, args, broadcast):
+    """
+    Calls a tool, broadcasting it over an array "previous" result.
+
+    A scalar tool whose "previous" argument is a list/array is applied to each
+    element in turn; batch tools always receive the whole array.
+    """
+    if broadcast is None or fn.batch:
+        return await invoke_tool(fn, args)
+    return [
+        await invoke_tool(fn, [item if i in broadcast else a for i, a in enumerate(args)])
+        # to_json turns NumPy elements into Python numbers, so scalar tools never see wrapping int64s.
+        for item in to_json(args[broadcast[0]])
+    ]
+
+async def execute_plan(user_prompt, agent=None, system_msg=None, mode=None):
+    with span("execute_plan", agent=agent) as s:
+        result = await _execute_plan(user_prompt, agent, system_msg, mode)
+        if "error" in result:
+            s.fail(result["error"])
+        s.set(steps=len(result["steps"]))
+        return result
+
+async def _execute_plan(user_prompt, agent, system_msg, mode):
     toolset = agent_tools.get(agent, tool_registry)
     tool_list = "\n".join([f"{name}: {fn.__doc__.strip()}" for name, fn in toolset.items()])
     if not system_msg:
         system_msg = (
             "You are a reasoning agent. Use tools from the list below to accomplish your tasks.\n"
             f"Tools:\n{tool_list}\n\n"
-            "For each step, return a list of tool calls like:\n"
-            '[\n'
-            '  {"tool": "example_tool", "args": [1, 2], "reasoning": "Explain why this tool is called."},\n'
-            '  {"tool": "another_tool", "args": ["previous"], "reasoning": "Explain why using the previous result."}\n'
-            ']\n'
-            'IMPORTANT: Always include a "reasoning" field explaining why this tool is being called.'
+            + plan_format([
+                ("example_tool", [1, 2], "Explain why this tool is called."),
+                ("another_tool", ["previous"], "Explain why using the previous result."),
+            ], mode)
         )
 
 
 
-    response = await client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": user_prompt}
-        ]
-    )
+    response = await complete([
+        {"role": "system", "content": system_msg},
+        {"role": "user", "content": user_prompt}
+    ], agent=agent)
 
     raw_plan = response.choices[0].message.content
     print("\n[LLM PLAN]", raw_plan)
-    plan = json.loads(raw_plan)
+    try:
+        plan = expand_plan(json.loads(raw_plan))
+    except json.JSONDecodeError:
+        PARSE_FAILURES.inc(agent=agent or "none")
+        raise
+    except ValueError as e:
+        PARSE_FAILURES.inc(agent=agent or "none")
+        return {"error": str(e), "steps": []}
 
     steps_log = []
     last_result = None
@@ -44,20 +145,23 @@ async def execute_plan(user_prompt, agent=None, system_msg=None):
             tool_name = step["tool"]
             args = step["args"]
             reasoning = step.get("reasoning", "")
-            args = [last_result if str(a).lower() == "previous" else a for a in args]
+            previous = [i for i, a in enumerate(args) if str(a).lower() == "previous"]
+            args = [last_result if i in previous else a for i, a in enumerate(args)]
+            broadcast = previous if previous and isinstance(last_result, (list, np.ndarray)) else None
 
             if tool_name in toolset:
-                result = toolset[tool_name](*args)
+                with span(f"tool:{tool_name}", broadcast=broadcast is not None):
+                    result = await call_tool(toolset[tool_name], args, broadcast)
             else:
-                await logger.log(tool=tool_name, args=args, error="Unknown tool", reasoning=reasoning)
+                await logger.log(tool=tool_name, args=to_json(args), error="Unknown tool", reasoning=reasoning)
                 raise ValueError(f"Unknown tool: {tool_name}")
 
-            await logger.log(tool=tool_name, args=args, result=result, reasoning=reasoning)
-            steps_log.append({"tool": tool_name, "args": args, "result": result, "reasoning": reasoning})
+            await logger.log(tool=tool_name, args=to_json(args), result=to_json(result), reasoning=reasoning)
+            steps_log.append({"tool": tool_name, "args": to_json(args), "result": to_json(result), "reasoning": reasoning})
             last_result = result
 
-        return {"final_result": last_result, "steps": steps_log}
+        return {"final_result": to_json(last_result), "steps": steps_log}
 
     except Exception as e:
-        await logger.log(tool=tool_name if "tool_name" in locals() else "unknown", args=args if "args" in locals() else [], error=str(e))
+        await logger.log(tool=tool_name if "tool_name" in locals() else "unknown", args=to_json(args) if "args" in locals() else [], error=str(e))
         return {"error": str(e), "steps": steps_log}
@@ -0,0 +1,119 @@
+"""
+Concurrent execution of planner sub-tasks.
+
+For compound prompts the planner returns
+    {"subtasks": [{"id": "sum", "agent": "math", "task": "Add 3 and 5"},
+                  {"id": "double", "agent": "math", "task": "Multiply {sum} by 2", "depends_on": ["sum"]}]}
+Every sub-task starts as soon as the sub-tasks it depends on have finished, so
+independent ones run concurrently and the wall-clock time follows the slowest
+chain rather than the sum. A dependency's result replaces its `{id}`
+placeholder in the task, or is appended to the task when there is none.
+"""
+
+import asyncio
+import time
+
+from memory_store.context import elide
+from utils.tracing import span
+
+def validate_subtasks(subtasks, registry):
+    """Returns an error message for a malformed sub-task list, or None."""
+    if not isinstance(subtasks, list) or not subtasks:
+        return "subtasks must be a non-empty list"
+    ids = [s.get("id") for s in subtasks if isinstance(s, dict)]
+    if len(ids) != len(subtasks) or not all(isinstance(i, str) for i in ids) or len(set(ids)) != len(ids):
+        return "every subtask needs a unique string id"
+    for s in subtasks:
+        if not isinstance(s.get("agent"), str) or s["agent"] not in registry or s["agent"] == "planner":
+            return f"Unknown agent: {s.get('agent')}"
+        if not isinstance(s.get("task"), str):
+            return f"Subtask {s['id']} needs a task string"
+        if not isinstance(s.get("depends_on", []), list):
+            return f"Subtask {s['id']}: depends_on must be a list of subtask ids"
+        missing = [d for d in s.get("depends_on", []) if d not in ids]
+        if missing:
+            return f"Subtask {s['id']} depends on unknown subtasks: {missing}"
+
+    # Kahn's algorithm: anything left unvisited is on a cycle.
+    remaining = {s["id"]: set(s.get("depends_on", [])) for s in subtasks}
+    ready = [i for i, deps in remaining.items() if not deps]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for i, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(i)
+    if remaining:
+        return f"Subtasks have a dependency cycle: {sorted(remaining)}"
+    return None
+
+def _with_inputs(task, inputs):
+    """Fills `{id}` placeholders with dependency results; appends results that have no placeholder."""
+    extra = []
+    for dep_id, value in inputs.items():
+        text = elide(value)
+        if "{" + dep_id + "}" in task:
+            task = task.replace("{" + dep_id + "}", text)
+        else:
+            extra.append(f"- {dep_id}: {text}")
+    if extra:
+        task += "\n\nResults of earlier sub-tasks:\n" + "\n".join(extra)
+    return task
+
+def _value(result):
+    if isinstance(result, dict):
+        return result.get("result", result.get("final_result"))
+    return result
+
+async def run_subtasks(subtasks, memory_log, registry):
+    """
+    Runs sub-tasks concurrently in dependency order and merges their outputs.
+
+    Returns:
+        dict: {"final_result": {id: result}, "subtasks": [...per-sub-task agent, task,
+        result or error, start_ms and duration_ms...], "wall_ms": ...}; or {"error": ...}
+        if the list is malformed.
+    """
+    error = validate_subtasks(subtasks, registry)
+    if error:
+        return {"error": error}
+
+    start = time.perf_counter()
+    reports = {s["id"]: {"id": s["id"], "agent": s["agent"]} for s in subtasks}
+    futures = {}
+
+    async def run(s):
+        report = reports[s["id"]]
+        deps = s.get("depends_on", [])
+        await asyncio.gather(*(futures[d] for d in deps))
+        failed = [d for d in deps if "error" in reports[d]]
+        report["task"] = _with_inputs(s["task"], {d: reports[d].get("result") for d in deps})
+        report["start_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if failed:
+            report["error"] = f"Skipped: depends on failed subtasks {failed}"
+        else:
+            with span(f"subtask:{s['id']}", agent=s["agent"]) as sp:
+                try:
+                    result = await registry[s["agent"]](report["task"], memory_log)
+                except Exception as e:
+                    result = {"error": f"{type(e).__name__}: {e}"}
+                if isinstance(result, dict) and "error" in result:
+                    report["error"] = result["error"]
+                    sp.fail(result["error"])
+                else:
+                    report["result"] = _value(result)
+        report["duration_ms"] = round((time.perf_counter() - start) * 1000 - report["start_ms"], 3)
+
+    for s in subtasks:
+        futures[s["id"]] = asyncio.ensure_future(run(s))
+    await asyncio.gather(*futures.values())
+
+    merged = {"final_result": {i: r.get("result") for i, r in reports.items() if "error" not in r}}
+    merged["subtasks"] = [reports[s["id"]] for s in subtasks]
+    merged["wall_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    errors = {i: r["error"] for i, r in reports.items() if "error" in r}
+    if errors:
+        merged["errors"] = errors
+    return merged
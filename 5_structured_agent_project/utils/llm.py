@@ -0,0 +1,144 @@
+"""
+Chat-completion client shared by the planner and execute_plan.
+
+LLM_BACKEND picks the client: "openai" (AsyncOpenAI) or "fake", an offline
+client that answers from a script after a configurable delay. Both expose
+`client.chat.completions.create(model=..., messages=...)` and return objects
+with the same `choices[0].message.content` and `usage` fields.
+"""
+
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import config
+from utils.tokens import count_tokens
+from utils.tracing import span
+
+class ScriptedResponder:
+    """
+    Picks a canned reply for a conversation.
+
+    Rules are tried in order. A rule matches when its "system" and "user"
+    substrings (each optional) occur in the system and last user message.
+    Its "response" is returned as-is if it is a string, otherwise as JSON.
+
+    Args:
+        rules (list): {"system": ..., "user": ..., "response": ...} dicts.
+        default (str|object, optional): Reply when no rule matches. Without it, a miss raises LookupError.
+    """
+
+    def __init__(self, rules, default=None):
+        self.rules = rules
+        self.default = default
+
+    @classmethod
+    def from_file(cls, path):
+        """Loads rules from a JSON file: a list of rules, or {"rules": [...], "default": ...}."""
+        with open(path) as f:
+            script = json.load(f)
+        if isinstance(script, list):
+            return cls(script)
+        return cls(script["rules"], script.get("default"))
+
+    def __call__(self, messages):
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        for rule in self.rules:
+            if rule.get("system", "") in system and rule.get("user", "") in user:
+                reply = rule["response"]
+                break
+        else:
+            if self.default is None:
+                raise LookupError(f"No scripted reply for: {user[:80]!r}")
+            reply = self.default
+        return reply if isinstance(reply, str) else json.dumps(reply)
+
+def make_response(content, model, prompt_tokens, completion_tokens):
+    """Builds an object shaped like an OpenAI chat completion."""
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(index=0, finish_reason="stop", message=SimpleNamespace(role="assistant", content=content))],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        ),
+    )
+
+class FakeChatClient:
+    """
+    Offline stand-in for AsyncOpenAI.
+
+    Each call sleeps latency_ms (plus up to jitter_ms) without blocking the
+    event loop, then answers with responder(messages).
+
+    Args:
+        responder (callable): Maps the message list to the reply text, e.g. a ScriptedResponder.
+        latency_ms (float): Simulated model latency per call.
+        jitter_ms (float): Extra uniform random latency per call.
+        seed (int): Seed for the jitter.
+    """
+
+    def __init__(self, responder, latency_ms=0, jitter_ms=0, seed=0):
+        self.responder = responder
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = 0
+        self._random = random.Random(seed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        content = self.responder(messages)
+        prompt_tokens = sum(count_tokens(m["content"]) for m in messages)
+        return make_response(content, model, prompt_tokens, count_tokens(content))
+
+def create_client(backend=None):
+    """
+    Creates the client for a backend name from config.py, wrapped for
+    recording or replay when LLM_CASSETTE_MODE is set.
+    """
+    backend = backend or config.LLM_BACKEND
+    if config.LLM_CASSETTE_MODE == "replay":
+        from utils.cassette import ReplayClient
+        return ReplayClient(config.LLM_CASSETTE, config.LLM_REPLAY_REALTIME)
+    if backend == "openai":
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=config.OPENAI_API_KEY)
+    elif backend == "fake":
+        if not config.FAKE_LLM_SCRIPT:
+            raise ValueError("LLM_BACKEND=fake needs FAKE_LLM_SCRIPT")
+        client = FakeChatClient(ScriptedResponder.from_file(config.FAKE_LLM_SCRIPT), config.FAKE_LLM_LATENCY_MS)
+    else:
+        raise ValueError(f"Unknown LLM backend: {backend}")
+    if config.LLM_CASSETTE_MODE == "record":
+        from utils.cassette import RecordingClient
+        return RecordingClient(client, config.LLM_CASSETTE)
+    return client
+
+_client = None
+
+def get_client():
+    """Returns the shared client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = create_client()
+    return _client
+
+def set_client(client):
+    """Replaces the shared client, e.g. with a FakeChatClient in benchmarks."""
+    global _client
+    _client = client
+
+async def complete(messages, model="gpt-4", agent=None):
+    """Runs one chat completion on the shared client inside an "llm" span that records token usage."""
+    with span("llm", model=model, agent=agent) as s:
+        response = await get_client().chat.completions.create(model=model, messages=messages)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            s.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+        return response
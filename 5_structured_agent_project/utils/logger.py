@@ -1,12 +1,208 @@
+"""
+Tool-call log with rotation, compressed segments and a sidecar index.
+
+Records are appended to `agent_trace_log.jsonl` as before. Once it reaches
+TRACE_LOG_MAX_BYTES, or its first record is TRACE_LOG_MAX_SECONDS old, it is
+rotated to a gzip segment (`agent_trace_log.00001.jsonl.gz`, ...) and one line
+describing the segment is appended to `agent_trace_log.index.jsonl`:
+    {"segment": ..., "start": ..., "end": ..., "records": ..., "errors": ..., "tools": [...]}
+Compression runs on a background thread, so no request waits for it;
+Logger.close() waits for segments still being compressed.
+
+Query with the index, which skips segments that cannot match:
+    python -m utils.logger --since 1h --errors
+    python -m utils.logger --tool search_vector_db --since 2026-10-19T06:00 --limit 20
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
 import json
-from datetime import datetime
+import os
+import re
+import shutil
+import threading
+from datetime import datetime, timedelta
+
+import config
+from utils.tracing import current_span, span
+
+def _stem(path):
+    return path[:-len(".jsonl")] if path.endswith(".jsonl") else path
+
+def index_path(path):
+    return f"{_stem(path)}.index.jsonl"
+
+def _new_stats():
+    return {"start": None, "end": None, "records": 0, "errors": 0, "tools": set()}
+
+def _add(stats, record):
+    stats["start"] = stats["start"] or record.get("timestamp")
+    stats["end"] = record.get("timestamp") or stats["end"]
+    stats["records"] += 1
+    stats["errors"] += "error" in record
+    if "tool" in record:
+        stats["tools"].add(record["tool"])
+
+def _scan(path):
+    stats = _new_stats()
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                _add(stats, json.loads(line))
+    return stats
 
 class Logger:
-    def __init__(self, path="agent_trace_log.jsonl"):
+    """
+    Appends tool-call records to a JSONL file and rotates it into indexed gzip segments.
+
+    Args:
+        path (str): Active log file.
+        max_bytes (int, optional): Rotate once the file reaches this size (0 disables). Defaults to TRACE_LOG_MAX_BYTES.
+        max_seconds (float, optional): Rotate once the first record is this old (0 disables). Defaults to TRACE_LOG_MAX_SECONDS.
+    """
+
+    def __init__(self, path="agent_trace_log.jsonl", max_bytes=None, max_seconds=None):
         self.path = path
+        self.max_bytes = config.TRACE_LOG_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_seconds = config.TRACE_LOG_MAX_SECONDS if max_seconds is None else max_seconds
+        self._stats = None
+        self._seq = 0
+        self._index_lock = threading.Lock()
+        self._compressing = set()
+
+    def _load(self):
+        """Picks up the active file's stats and finishes rotations interrupted by a restart."""
+        stem = _stem(self.path)
+        pending = sorted(glob.glob(f"{glob.escape(stem)}.[0-9][0-9][0-9][0-9][0-9].jsonl"))
+        segments = glob.glob(f"{glob.escape(stem)}.[0-9][0-9][0-9][0-9][0-9].jsonl*")
+        self._seq = max((int(re.search(r"\.(\d{5})\.jsonl", s).group(1)) for s in segments), default=0)
+        for segment in pending:
+            self._compress(segment, _scan(segment))
+        self._stats = _scan(self.path) if os.path.exists(self.path) else _new_stats()
+
+    def _due(self, timestamp):
+        stats = self._stats
+        if not stats["records"]:
+            return False
+        if self.max_bytes and os.path.getsize(self.path) >= self.max_bytes:
+            return True
+        age = datetime.fromisoformat(timestamp) - datetime.fromisoformat(stats["start"])
+        return bool(self.max_seconds) and age.total_seconds() >= self.max_seconds
+
+    def _rotate(self):
+        """Moves the active file aside; returns (segment, stats) for _compress."""
+        self._seq += 1
+        segment = f"{_stem(self.path)}.{self._seq:05d}.jsonl"
+        os.replace(self.path, segment)
+        stats, self._stats = self._stats, _new_stats()
+        return segment, stats
+
+    def _compress(self, segment, stats):
+        with open(segment, "rb") as src, gzip.open(f"{segment}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(segment)
+        entry = {**stats, "segment": os.path.basename(f"{segment}.gz"), "tools": sorted(stats["tools"])}
+        with self._index_lock, open(index_path(self.path), "a") as f:
+            f.write(json.dumps(entry) + "\n")
 
     async def log(self, **kwargs):
         kwargs["timestamp"] = datetime.utcnow().isoformat()
-        print("[LOG]", kwargs)
-        with open(self.path, "a") as f:
-            f.write(json.dumps(kwargs) + "\n")
+        parent = current_span()
+        if parent is not None:
+            kwargs["trace_id"], kwargs["span_id"] = parent.trace_id, parent.span_id
+        with span("log"):
+            print("[LOG]", kwargs)
+            if self._stats is None:
+                self._load()
+            rotated = self._rotate() if self._due(kwargs["timestamp"]) else None
+            with open(self.path, "a") as f:
+                f.write(json.dumps(kwargs) + "\n")
+            _add(self._stats, kwargs)
+            if rotated:
+                # Compress in the background; new records already go to the fresh file.
+                task = asyncio.create_task(asyncio.to_thread(self._compress, *rotated))
+                self._compressing.add(task)
+                task.add_done_callback(self._compressed)
+
+    def _compressed(self, task):
+        self._compressing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # The segment stays uncompressed and is picked up by _load on the next start.
+            print(f"[LOG] compression failed: {type(task.exception()).__name__}: {task.exception()}")
+
+    async def close(self):
+        """Waits for segments that are still being compressed."""
+        while self._compressing:
+            await asyncio.gather(*self._compressing, return_exceptions=True)
+
+def _parse_time(value):
+    """Accepts an ISO timestamp or a duration back from now like 30m, 1h, 2d (UTC)."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd])", value)
+    if match:
+        unit = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}[match.group(2)]
+        return datetime.utcnow() - timedelta(**{unit: float(match.group(1))})
+    return datetime.fromisoformat(value)
+
+def _segment_matches(entry, since, until, tool, errors):
+    if since and entry["end"] and datetime.fromisoformat(entry["end"]) < since:
+        return False
+    if until and entry["start"] and datetime.fromisoformat(entry["start"]) > until:
+        return False
+    if tool and tool not in entry["tools"]:
+        return False
+    return not (errors and not entry["errors"])
+
+def query(path="agent_trace_log.jsonl", since=None, until=None, tool=None, errors=False, trace_id=None):
+    """
+    Yields log records matching every given filter, oldest segment first.
+
+    Segments whose index entry rules them out are never opened; the others are
+    streamed line by line, with a substring check before each JSON parse.
+    """
+    files = []
+    if os.path.exists(index_path(path)):
+        with open(index_path(path)) as f:
+            # Segments compressed concurrently can be indexed out of order.
+            entries = sorted((json.loads(line) for line in f if line.strip()), key=lambda e: e["segment"])
+        base = os.path.dirname(path)
+        files = [os.path.join(base, e["segment"]) for e in entries if _segment_matches(e, since, until, tool, errors)]
+    if os.path.exists(path):
+        files.append(path)
+
+    needles = [n for n in (
+        tool and json.dumps({"tool": tool})[1:-1],
+        errors and '"error": ',
+        trace_id and json.dumps({"trace_id": trace_id})[1:-1],
+    ) if n]
+    for file in files:
+        with (gzip.open(file, "rt") if file.endswith(".gz") else open(file)) as f:
+            for line in f:
+                if not all(n in line for n in needles) or not line.strip():
+                    continue
+                record = json.loads(line)
+                timestamp = datetime.fromisoformat(record["timestamp"])
+                if (since and timestamp < since) or (until and timestamp > until):
+                    continue
+                if (tool and record.get("tool") != tool) or (errors and "error" not in record):
+                    continue
+                if trace_id and record.get("trace_id") != trace_id:
+                    continue
+                yield record
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the tool-call log, including rotated segments.")
+    parser.add_argument("path", nargs="?", default="agent_trace_log.jsonl")
+    parser.add_argument("--since", type=_parse_time, help="ISO time (UTC) or a duration like 30m, 1h, 2d")
+    parser.add_argument("--until", type=_parse_time)
+    parser.add_argument("--tool")
+    parser.add_argument("--errors", action="store_true", help="only records with an error")
+    parser.add_argument("--trace-id")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many records (0 = all)")
+    args = parser.parse_args()
+
+    for n, record in enumerate(query(args.path, args.since, args.until, args.tool, args.errors, args.trace_id), 1):
+        print(json.dumps(record))
+        if n == args.limit:
+            break
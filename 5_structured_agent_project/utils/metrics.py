@@ -0,0 +1,212 @@
+"""
+In-process metrics registry with Prometheus text output.
+
+Latencies, token usage and errors are collected from finished tracing spans
+(see utils/tracing.py), so the hot path only pays for a dict lookup and a
+bisect per span. Queue depths and cache stats are gauges read through
+callbacks when the metrics are rendered.
+
+Server mode exposes render() at GET /metrics; CLI mode rewrites
+METRICS_DUMP_PATH every METRICS_DUMP_INTERVAL seconds (see dump_periodically).
+"""
+
+import asyncio
+import math
+import os
+from bisect import bisect_left
+
+import config
+from utils import tracing
+
+# Seconds. Tools are usually sub-millisecond, LLM calls take seconds.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = [*zip(labelnames, key), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, _format_labels(self.labelnames, key), value
+
+class Gauge(Counter):
+    """
+    A value that goes up and down. With fn, the value is read at render time:
+    fn returns a number, or a {label values tuple: number} dict.
+    """
+    type = "gauge"
+
+    def __init__(self, name, help, labelnames=(), fn=None):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+
+    def set(self, value, **labels):
+        self.values[tuple(labels[n] for n in self.labelnames)] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        if self.fn is None:
+            yield from super().samples()
+            return
+        values = self.fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in values.items():
+            yield self.name, _format_labels(self.labelnames, key), value
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.labelnames)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def samples(self):
+        for key, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, key, [("le", _format_value(bound))]), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), cumulative
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=(), fn=None):
+        return self._add(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def render(self):
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+REQUEST_SECONDS = registry.histogram("agent_request_seconds", "multi_agent_router latency by chosen agent.", ["agent"])
+AGENT_SECONDS = registry.histogram("agent_run_seconds", "Agent call latency.", ["agent"])
+TOOL_SECONDS = registry.histogram("agent_tool_seconds", "Tool call latency.", ["tool"])
+LLM_SECONDS = registry.histogram("agent_llm_seconds", "Chat completion latency.", ["agent", "model"])
+LLM_TOKENS = registry.counter("agent_llm_tokens_total", "Tokens reported in the API usage field.", ["agent", "model", "kind"])
+ERRORS = registry.counter("agent_errors_total", "Failed spans by stage (router, agent, execute_plan, tool, llm).", ["stage"])
+PARSE_FAILURES = registry.counter("agent_plan_parse_failures_total", "LLM plans that were not valid JSON or not a list of tool calls.", ["agent"])
+IN_FLIGHT = registry.gauge("agent_requests_in_flight", "multi_agent_router calls currently running.")
+
+_caches = {}
+
+def register_cache(name, cache):
+    """Exposes an LRUCache's hits, misses, hit ratio and size under cache=name."""
+    _caches[name] = cache
+
+def _cache_stat(field):
+    return lambda: {(name,): cache.stats()[field] for name, cache in _caches.items()}
+
+registry.gauge("agent_cache_hits", "Cache hits since startup.", ["cache"], _cache_stat("hits"))
+registry.gauge("agent_cache_misses", "Cache misses since startup.", ["cache"], _cache_stat("misses"))
+registry.gauge("agent_cache_hit_ratio", "Cache hits / lookups since startup.", ["cache"], _cache_stat("hit_rate"))
+registry.gauge("agent_cache_entries", "Entries currently cached.", ["cache"], _cache_stat("size"))
+
+def _sandbox_stat(field):
+    def read():
+        from utils.sandbox import _sandbox
+        return getattr(_sandbox, field)() if _sandbox is not None else 0
+    return read
+
+registry.gauge("agent_sandbox_idle_workers", "Sandbox workers waiting for a call.", fn=_sandbox_stat("idle_workers"))
+registry.gauge("agent_sandbox_waiting_calls", "Sandboxed tool calls queued for a worker.", fn=_sandbox_stat("waiting_calls"))
+
+def _memory_write_queue():
+    from memory_store import _memory_store
+    backend = _memory_store.backend if _memory_store is not None else None
+    return backend.pending_writes() if backend is not None else 0
+
+registry.gauge("agent_memory_write_queue", "Memory entries waiting to be written to the database.", fn=_memory_write_queue)
+
+def _observe_span(s):
+    kind, _, target = s.name.partition(":")
+    seconds = s.duration_ms / 1000
+    if kind == "router":
+        REQUEST_SECONDS.observe(seconds, agent=s.attributes.get("agent") or "none")
+    elif kind == "agent":
+        AGENT_SECONDS.observe(seconds, agent=target)
+    elif kind == "tool":
+        TOOL_SECONDS.observe(seconds, tool=target)
+    elif kind == "llm":
+        agent, model = s.attributes.get("agent") or "none", s.attributes.get("model")
+        LLM_SECONDS.observe(seconds, agent=agent, model=model)
+        if "prompt_tokens" in s.attributes:
+            LLM_TOKENS.inc(s.attributes["prompt_tokens"], agent=agent, model=model, kind="prompt")
+            LLM_TOKENS.inc(s.attributes["completion_tokens"], agent=agent, model=model, kind="completion")
+    if s.status == "error":
+        ERRORS.inc(stage=kind)
+
+if config.METRICS:
+    tracing.add_listener(_observe_span)
+
+def dump(path=None):
+    """Atomically rewrites path (METRICS_DUMP_PATH) with the current metrics."""
+    path = path or config.METRICS_DUMP_PATH
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+async def dump_periodically(interval=None, path=None):
+    """Dumps the metrics every interval seconds until cancelled."""
+    interval = interval or config.METRICS_DUMP_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        dump(path)
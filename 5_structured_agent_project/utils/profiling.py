@@ -0,0 +1,80 @@
+"""
+Opt-in per-request profiling.
+
+profile_call(fn, *args) runs one request under cProfile and tracemalloc and
+writes two files to PROFILE_DIR, named after the request's trace id:
+    <trace_id>.prof   cProfile stats (open with `python -m pstats` or snakeviz)
+    <trace_id>.txt    top functions by cumulative time, allocation growth by
+                      line, and peak traced memory
+
+cProfile profiles the whole event-loop thread, so any other request running at
+the same time shows up in the profile too; profiled requests are serialised so
+at least their profiles do not overlap. Work on other threads (e.g. the
+retrieval pool) is only visible as time spent waiting for it.
+
+Nothing here runs unless a request is profiled: enable it with
+`python main.py --profile`, PROFILE=1, or an `X-Profile: 1` header in server mode.
+"""
+
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+
+import config
+from utils.tracing import span
+
+_lock = None
+
+def _allocation_report(before, after, top):
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+    stats = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    return "\n".join(str(stat) for stat in stats[:top])
+
+def _write_report(trace_id, profiler, before, after, peak, wall_ms, out_dir, top):
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, trace_id)
+    profiler.dump_stats(f"{base}.prof")
+
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+    with open(f"{base}.txt", "w") as f:
+        f.write(f"trace {trace_id}  wall {wall_ms:.1f} ms  peak traced memory {peak / 2**20:.2f} MiB\n\n")
+        f.write(f"== cProfile, top {top} by cumulative time ==\n{stream.getvalue()}\n")
+        f.write(f"== Allocations, top {top} by growth during the request ==\n{_allocation_report(before, after, top)}\n")
+    return f"{base}.txt"
+
+async def profile_call(fn, *args, out_dir=None, top=None):
+    """Awaits fn(*args) under cProfile and tracemalloc and writes its report; returns (result, trace id)."""
+    global _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+    out_dir = out_dir or config.PROFILE_DIR
+    top = top or config.PROFILE_TOP
+
+    async with _lock:
+        # The profile span is the root of the request's trace, so its id tags the report.
+        with span("profile") as s:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                return await fn(*args), s.trace_id
+            finally:
+                profiler.disable()
+                wall_ms = (time.perf_counter() - start) * 1000
+                after = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                if started:
+                    tracemalloc.stop()
+                report = _write_report(s.trace_id, profiler, before, after, peak, wall_ms, out_dir, top)
+                s.set(report=report)
+                print(f"[PROFILE] {report}")
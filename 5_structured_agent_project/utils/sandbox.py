@@ -0,0 +1,171 @@
+"""
+Process-isolated tool execution.
+
+A Sandbox keeps a pool of pre-warmed worker processes (`python -m utils.sandbox`).
+Each call is pickled to an idle worker over its stdin, and the result comes back
+over its stdout. Workers run under a per-call CPU-time limit and a fixed address
+space limit; a worker that dies or runs past its deadline is killed and replaced,
+and the call raises SandboxError instead of stalling the event loop.
+"""
+
+import asyncio
+import math
+import os
+import pickle
+import struct
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, only the wall-clock deadline applies.
+    resource = None
+
+_HEADER = struct.Struct("!I")
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class SandboxError(Exception):
+    """Raised when a sandboxed tool call is killed or cannot complete."""
+
+class _Worker:
+    def __init__(self, process):
+        self.process = process
+
+    @classmethod
+    async def start(cls, memory_mb, preload):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PROJECT_ROOT, env.get("PYTHONPATH")]))
+        env.setdefault("OPENBLAS_NUM_THREADS", "1")
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "utils.sandbox", str(memory_mb), *preload,
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, env=env,
+        )
+        # The worker sends an empty frame once its preload imports are done.
+        await process.stdout.readexactly(_HEADER.size)
+        return cls(process)
+
+    async def call(self, payload):
+        self.process.stdin.write(_HEADER.pack(len(payload)) + payload)
+        await self.process.stdin.drain()
+        (size,) = _HEADER.unpack(await self.process.stdout.readexactly(_HEADER.size))
+        return await self.process.stdout.readexactly(size)
+
+    async def kill(self):
+        if self.process.returncode is None:
+            self.process.kill()
+        await self.process.wait()
+
+class Sandbox:
+    """
+    Pool of worker processes that run tools under CPU and memory limits.
+
+    Args:
+        size (int): Number of pre-warmed workers.
+        cpu_seconds (int): CPU-time budget for a single call.
+        memory_mb (int): Address-space limit of each worker.
+        timeout (float, optional): Wall-clock deadline per call. Defaults to 2 * cpu_seconds + 1.
+        preload (tuple): Modules each worker imports at startup.
+    """
+
+    def __init__(self, size=2, cpu_seconds=2, memory_mb=1024, timeout=None, preload=("tools.math_tools",)):
+        self.size = size
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.timeout = timeout or 2 * cpu_seconds + 1
+        self.preload = preload
+        self._idle = None
+        self._waiting = 0
+
+    async def start(self):
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            workers = await asyncio.gather(*[_Worker.start(self.memory_mb, self.preload) for _ in range(self.size)])
+            for worker in workers:
+                self._idle.put_nowait(worker)
+
+    async def run(self, fn, *args):
+        await self.start()
+        payload = pickle.dumps((fn, args, self.cpu_seconds), protocol=pickle.HIGHEST_PROTOCOL)
+        self._waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self._waiting -= 1
+        try:
+            reply = await asyncio.wait_for(worker.call(payload), self.timeout)
+        except asyncio.TimeoutError:
+            await self._recycle(worker)
+            raise SandboxError(f"{fn.__name__} exceeded its {self.timeout}s deadline")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            await self._recycle(worker)
+            raise SandboxError(f"{fn.__name__} was killed after exceeding its CPU or memory limit")
+        except asyncio.CancelledError:
+            # The worker may still answer later, so it cannot be reused.
+            asyncio.ensure_future(self._recycle(worker))
+            raise
+        self._idle.put_nowait(worker)
+        ok, value = pickle.loads(reply)
+        if not ok:
+            raise SandboxError(value)
+        return value
+
+    def idle_workers(self):
+        return self._idle.qsize() if self._idle is not None else 0
+
+    def waiting_calls(self):
+        return self._waiting
+
+    async def _recycle(self, worker):
+        """Kills a worker and puts a fresh one in its place."""
+        await worker.kill()
+        self._idle.put_nowait(await _Worker.start(self.memory_mb, self.preload))
+
+    async def close(self):
+        if self._idle is not None:
+            while not self._idle.empty():
+                await self._idle.get_nowait().kill()
+            self._idle = None
+
+_sandbox = None
+
+def get_sandbox():
+    """Returns the shared Sandbox configured from config.py."""
+    global _sandbox
+    if _sandbox is None:
+        from config import SANDBOX_WORKERS, SANDBOX_CPU_SECONDS, SANDBOX_MEMORY_MB
+        _sandbox = Sandbox(SANDBOX_WORKERS, SANDBOX_CPU_SECONDS, SANDBOX_MEMORY_MB)
+    return _sandbox
+
+def _limit_cpu(seconds):
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime) + seconds
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, resource.RLIM_INFINITY))
+
+def _worker_main(memory_mb, preload):
+    # Keep the protocol on a private copy of stdout; tool prints go to stderr.
+    out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    stdin = sys.stdin.buffer
+    for module in preload:
+        __import__(module)
+    if resource is not None:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    out.write(_HEADER.pack(0))
+    out.flush()
+
+    while True:
+        header = stdin.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        fn, args, cpu_seconds = pickle.loads(stdin.read(_HEADER.unpack(header)[0]))
+        if resource is not None:
+            _limit_cpu(cpu_seconds)
+        try:
+            reply = pickle.dumps((True, fn(*args)), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            reply = pickle.dumps((False, f"{type(e).__name__}: {e}"))
+        out.write(_HEADER.pack(len(reply)) + reply)
+        out.flush()
+
+if __name__ == "__main__":
+    _worker_main(int(sys.argv[1]), sys.argv[2:])
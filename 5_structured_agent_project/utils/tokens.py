@@ -0,0 +1,53 @@
+"""
+Token counting for prompt budgets.
+
+Uses tiktoken's cl100k_base encoding when it is installed and its vocabulary
+can be loaded; otherwise estimates about four characters per token.
+"""
+
+import math
+
+_encoding = None
+_loaded = False
+
+def _get_encoding():
+    global _encoding, _loaded
+    if not _loaded:
+        _loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+def truncate_tokens(text, max_tokens):
+    """Cuts text down to at most max_tokens tokens."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+def pack(texts, max_tokens):
+    """
+    Keeps texts in order while they fit in max_tokens, skipping any that would overflow.
+
+    If not even the first text fits, returns it truncated to the budget, so the
+    best result is never dropped entirely.
+    """
+    packed, used = [], 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if used + tokens <= max_tokens:
+            packed.append(text)
+            used += tokens
+    if not packed and texts:
+        packed.append(truncate_tokens(texts[0], max_tokens))
+    return packed
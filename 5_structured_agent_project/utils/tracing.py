@@ -0,0 +1,146 @@
+"""
+Hierarchical tracing spans.
+
+`with span("name", **attributes) as s:` opens a span whose parent is the span
+currently open in this context (tracked with contextvars, so it follows
+awaits, tasks and asyncio.to_thread). The outermost span starts a new trace.
+When a span closes it is appended to TRACE_PATH as one JSON line with its
+trace/span/parent ids, start time, duration, attributes and outcome, and
+handed to any listeners (utils/metrics.py registers one). With TRACING off
+and no listeners, span() does nothing.
+
+Convert one request to Chrome trace-event format (open it in chrome://tracing
+or https://ui.perfetto.dev to see it as a flame chart):
+    python -m utils.tracing agent_spans.jsonl --out trace.json            # last trace
+    python -m utils.tracing agent_spans.jsonl --trace <trace_id> --out trace.json
+"""
+
+import argparse
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+_current = contextvars.ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+_listeners = []
+
+class Span:
+    def __init__(self, name, parent=None, **attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(8).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error = None
+        self.start = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def fail(self, error):
+        """Marks the span as failed without raising, e.g. when an error is returned as a value."""
+        self.status = "error"
+        self.error = str(error)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+def current_span():
+    return _current.get()
+
+def add_listener(fn):
+    """Calls fn(span) for every finished span, whether or not TRACING is on."""
+    _listeners.append(fn)
+
+@contextmanager
+def span(name, new_trace=False, **attributes):
+    """
+    Opens a child span of the current one (or a new trace) for the duration of the block.
+    new_trace=True always starts a new trace, e.g. for background work spawned by a request.
+    """
+    if not (config.TRACING or _listeners):
+        yield Span(name, **attributes)
+        return
+    s = Span(name, None if new_trace else _current.get(), **attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.fail(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        s.duration_ms = round((time.perf_counter() - s._start) * 1000, 3)
+        _current.reset(token)
+        for listener in _listeners:
+            listener(s)
+        if config.TRACING:
+            _export(s)
+
+def _export(s):
+    line = json.dumps(s.to_dict(), default=str) + "\n"
+    with _write_lock, open(config.TRACE_PATH, "a") as f:
+        f.write(line)
+
+def load_spans(path, trace_id=None):
+    """Reads spans from a JSONL export; trace_id="last" picks the most recently finished root span's trace."""
+    with open(path) as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    if trace_id == "last":
+        roots = [s for s in spans if s["parent_id"] is None]
+        trace_id = roots[-1]["trace_id"] if roots else None
+    if trace_id:
+        spans = [s for s in spans if s["trace_id"] == trace_id]
+    return spans
+
+def to_chrome_trace(spans):
+    """Converts spans to Chrome trace-event format: one complete ("X") event per span, one row per trace."""
+    rows = {}
+    events = []
+    for s in sorted(spans, key=lambda s: s["start"]):
+        tid = rows.setdefault(s["trace_id"], len(rows) + 1)
+        args = {**s["attributes"], "span_id": s["span_id"], "parent_id": s["parent_id"], "status": s["status"]}
+        if s["error"]:
+            args["error"] = s["error"]
+        events.append({
+            "name": s["name"],
+            "cat": s["name"].split(":")[0],
+            "ph": "X",
+            "ts": round(s["start"] * 1e6),
+            "dur": round(s["duration_ms"] * 1000),
+            "pid": 1,
+            "tid": tid,
+            "args": args,
+        })
+    for trace_id, tid in rows.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": f"trace {trace_id}"}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert exported spans to Chrome trace-event JSON.")
+    parser.add_argument("spans", nargs="?", default=config.TRACE_PATH)
+    parser.add_argument("--trace", default="last", help='trace id, "last" (default) or "all"')
+    parser.add_argument("--out", default="trace.json")
+    args = parser.parse_args()
+
+    spans = load_spans(args.spans, None if args.trace == "all" else args.trace)
+    with open(args.out, "w") as f:
+        json.dump(to_chrome_trace(spans), f)
+    print(f"✅ Wrote {len(spans)} spans to {args.out}")
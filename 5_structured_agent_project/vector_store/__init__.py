@@ -0,0 +1,127 @@
+import os
+
+from config import (
+    CHROMA_DB_PATH, EMBED_MODEL_NAME, EMBED_BACKEND, EMBED_ONNX_DIR, EMBED_THREADS, EMBED_SERVER_SOCKET,
+    VECTOR_BACKEND, VECTOR_INDEX_PATH, IVF_NLIST, IVF_NPROBE, VECTOR_QUANTIZATION, VECTOR_RERANK,
+)
+from utils.bm25 import BM25Index
+from vector_store.base import VectorStore
+
+def create_store(backend):
+    """Creates the VectorStore for a backend name from config.py."""
+    if backend == "chroma":
+        from vector_store.chroma_store import ChromaStore
+        return ChromaStore(CHROMA_DB_PATH)
+    if backend == "numpy" and VECTOR_QUANTIZATION:
+        from vector_store.quantized_store import QuantizedStore
+        return QuantizedStore(VECTOR_INDEX_PATH, VECTOR_QUANTIZATION, VECTOR_RERANK)
+    if backend == "numpy":
+        from vector_store.numpy_store import NumpyStore
+        return NumpyStore(VECTOR_INDEX_PATH)
+    if backend == "ivf":
+        from vector_store.ivf_store import IVFStore
+        return IVFStore(VECTOR_INDEX_PATH, nlist=IVF_NLIST, nprobe=IVF_NPROBE)
+    raise ValueError(f"Unknown vector backend: {backend}")
+
+# The store and embedding model are created on first access (`from vector_store
+# import store`), so backend modules can be imported without loading the model.
+_store = None
+_embed_model = None
+_local_embed_model = None
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = create_store(VECTOR_BACKEND)
+    return _store
+
+def get_local_embed_model():
+    """Returns the in-process embedder, loading the model on first use."""
+    global _local_embed_model
+    if _local_embed_model is None:
+        from vector_store.embeddings import create_embedder
+        _local_embed_model = create_embedder(EMBED_BACKEND, EMBED_MODEL_NAME, EMBED_THREADS, EMBED_ONNX_DIR)
+    return _local_embed_model
+
+def get_embed_model():
+    """Returns the shared embedding server client if one is running, else the in-process embedder."""
+    global _embed_model
+    if _embed_model is None:
+        if EMBED_SERVER_SOCKET and os.path.exists(EMBED_SERVER_SOCKET):
+            from vector_store.embed_server import RemoteEmbedder
+            _embed_model = RemoteEmbedder(EMBED_SERVER_SOCKET, get_local_embed_model)
+        else:
+            _embed_model = get_local_embed_model()
+    return _embed_model
+
+def __getattr__(name):
+    if name == "store":
+        return get_store()
+    if name == "embed_model":
+        return get_embed_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_lexical_index = None
+_lexical_version = None
+
+# Bumped on every change made through add_documents / upsert_documents /
+# delete_documents. Combined with the store's own version, which also moves when
+# another process (e.g. rag_setup/load_rag_data.py) changes the store, it tells
+# caches of query results when to drop their entries.
+_version = 0
+
+def get_version():
+    return _version, get_store().version()
+
+def get_lexical_index():
+    """Returns the BM25 index over the store, (re)building it on first use and after changes by other processes."""
+    global _lexical_index, _lexical_version
+    version = get_store().version()
+    if _lexical_index is None or version != _lexical_version:
+        index = BM25Index()
+        index.add(*get_store().get_documents())
+        _lexical_index, _lexical_version = index, version
+    return _lexical_index
+
+def add_documents(docs, ids, metadatas=None):
+    """
+    Embeds and adds documents (with optional metadata dicts) to the store, keeping the BM25 index in sync.
+
+    Ids already in the store are skipped, as the stores do; use upsert_documents to replace them.
+    """
+    _write(docs, ids, metadatas, replace=False)
+
+def upsert_documents(docs, ids, metadatas=None):
+    """Like add_documents, but documents whose ids already exist replace the stored ones."""
+    _write(docs, ids, metadatas, replace=True)
+
+def _write(docs, ids, metadatas, replace):
+    global _version, _lexical_version
+    if _lexical_index is not None:
+        get_lexical_index()  # catch up with other processes' changes first
+    metadatas = metadatas or [{}] * len(ids)
+    if replace:
+        get_store().delete(ids)
+    elif _lexical_index is not None:
+        # The BM25 index mirrors the store, so it tells which ids the store will skip.
+        keep = [i for i, doc_id in enumerate(ids) if doc_id not in _lexical_index.doc_lengths]
+        docs, ids, metadatas = [docs[i] for i in keep], [ids[i] for i in keep], [metadatas[i] for i in keep]
+    if not ids:
+        return
+    embeddings = get_embed_model().encode(docs)
+    get_store().add(ids, embeddings, docs, metadatas)
+    if _lexical_index is not None:
+        _lexical_index.add(ids, docs, metadatas)
+        _lexical_version = get_store().version()
+    _version += 1
+
+def delete_documents(ids):
+    """Deletes documents from the store and the BM25 index."""
+    global _version, _lexical_version
+    if _lexical_index is not None:
+        get_lexical_index()  # catch up with other processes' changes first
+    get_store().delete(ids)
+    if _lexical_index is not None:
+        _lexical_index.remove(ids)
+        _lexical_version = get_store().version()
+    _version += 1
@@ -0,0 +1,30 @@
+class VectorStore:
+    """
+    Interface the RAG tools use to store and search document embeddings.
+
+    Query results follow Chroma's shape: one inner list per query embedding,
+    e.g. {"ids": [["doc-1", ...]], "documents": [[...]], "metadatas": [[...]], "distances": [[...]]}.
+    Metadata filters (`where`) use Chroma's syntax; see vector_store/filters.py.
+    """
+
+    def add(self, ids, embeddings, documents, metadatas=None):
+        """Adds documents with their embeddings and metadata dicts. Ids already in the store are skipped."""
+        raise NotImplementedError
+
+    def query(self, embeddings, top_k, where=None):
+        """Returns the top_k nearest documents matching `where` for each query embedding."""
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    def get_documents(self):
+        """Returns (ids, documents, metadatas) for everything in the store."""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def version(self):
+        """Returns a value that changes whenever the stored documents change, also when another process changed them."""
+        raise NotImplementedError
@@ -0,0 +1,37 @@
+import chromadb
+from vector_store.base import VectorStore
+
+class ChromaStore(VectorStore):
+    """VectorStore backed by a persistent Chroma collection."""
+
+    def __init__(self, path, name="rag_demo"):
+        self.client = chromadb.PersistentClient(path=path)
+        self.collection = self.client.get_or_create_collection(name)
+
+    def add(self, ids, embeddings, documents, metadatas=None):
+        # Chroma rejects empty metadata dicts; None means "no metadata".
+        metadatas = [m or None for m in metadatas] if metadatas else None
+        self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def query(self, embeddings, top_k, where=None):
+        results = self.collection.query(
+            query_embeddings=embeddings, n_results=top_k, where=where or None,
+            include=["documents", "metadatas", "distances"],
+        )
+        results["metadatas"] = [[m or {} for m in row] for row in results["metadatas"]]
+        return {key: results[key] for key in ("ids", "documents", "metadatas", "distances")}
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def get_documents(self):
+        existing = self.collection.get(include=["documents", "metadatas"])
+        return existing["ids"], existing["documents"], [m or {} for m in existing["metadatas"]]
+
+    def count(self):
+        return self.collection.count()
+
+    def version(self):
+        # Chroma exposes no change counter; the document count catches other
+        # processes' adds and deletes, but not an in-place update.
+        return self.collection.count()
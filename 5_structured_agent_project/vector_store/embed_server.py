@@ -0,0 +1,214 @@
+"""
+Shared embedding server for multi-process deployments.
+
+One `python -m vector_store.embed_server` process loads the embedding model and
+serves encode requests from local clients over a Unix domain socket. Requests
+that arrive within a few milliseconds of each other are encoded as one batch.
+Result vectors are written to a shared-memory segment owned by the connection,
+so only a small JSON header crosses the socket.
+
+Wire format, both directions: 4-byte big-endian length + JSON.
+    request:  {"texts": ["...", ...]}
+    response: {"shm": "<segment name>", "shape": [n, dim]}  or  {"error": "..."}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import struct
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+_HEADER = struct.Struct("!I")
+
+def _pack(message):
+    payload = json.dumps(message).encode()
+    return _HEADER.pack(len(payload)) + payload
+
+class EmbedServer:
+    """
+    Serves encode requests for one embedder, batching across clients.
+
+    Args:
+        embedder: Object with an encode(list_of_texts) method returning (n, dim) float32.
+        socket_path (str): Unix socket to listen on.
+        max_batch (int): Texts per model call.
+        max_wait_ms (float): How long the first request waits for others to join its batch.
+    """
+
+    def __init__(self, embedder, socket_path, max_batch=64, max_wait_ms=5):
+        self.embedder = embedder
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        serving = asyncio.current_task()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, serving.cancel)
+        self._queue = asyncio.Queue()
+        batcher = asyncio.create_task(self._batcher())
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        print(f"✅ Embedding server listening on {self.socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            batcher.cancel()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    async def encode(self, texts):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future))
+        return await future
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            count = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while count < self.max_batch and (timeout := deadline - loop.time()) > 0:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                count += len(item[0])
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = np.asarray(await asyncio.to_thread(self.embedder.encode, texts), dtype=np.float32)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    async def _handle(self, reader, writer):
+        segment = None
+        try:
+            while True:
+                (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+                request = json.loads(await reader.readexactly(size))
+                try:
+                    vectors = await self.encode(request["texts"])
+                except Exception as e:
+                    writer.write(_pack({"error": f"{type(e).__name__}: {e}"}))
+                    await writer.drain()
+                    continue
+                # Each connection reuses one segment, growing it when a result does not fit.
+                if segment is None or segment.size < vectors.nbytes:
+                    if segment is not None:
+                        segment.close()
+                        segment.unlink()
+                    segment = shared_memory.SharedMemory(create=True, size=max(vectors.nbytes, 1 << 20))
+                np.ndarray(vectors.shape, dtype=np.float32, buffer=segment.buf)[:] = vectors
+                writer.write(_pack({"shm": segment.name, "shape": list(vectors.shape)}))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            if segment is not None:
+                segment.close()
+                segment.unlink()
+            writer.close()
+
+class RemoteEmbedder:
+    """
+    Client for EmbedServer with the same encode() interface as the local embedders.
+
+    Each thread keeps its own connection. If the server is unreachable the call
+    is encoded in-process with the embedder returned by `fallback()`.
+
+    Args:
+        socket_path (str): Unix socket of the server.
+        fallback (callable): Returns the in-process embedder, created on first use.
+    """
+
+    def __init__(self, socket_path, fallback):
+        self.socket_path = socket_path
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(self.socket_path)
+        self._local.conn = conn
+        self._local.segment = None
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        if getattr(self._local, "segment", None) is not None:
+            self._local.segment.close()
+        self._local.conn = self._local.segment = None
+
+    def _recv_exactly(self, conn, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Embedding server closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _attach(self, name):
+        segment = self._local.segment
+        if segment is None or segment.name != name:
+            if segment is not None:
+                segment.close()
+            segment = shared_memory.SharedMemory(name=name)
+            # The server owns the segment; stop this process's tracker from unlinking it.
+            resource_tracker.unregister(segment._name, "shared_memory")
+            self._local.segment = segment
+        return segment
+
+    def _remote_encode(self, texts):
+        conn = getattr(self._local, "conn", None) or self._connect()
+        conn.sendall(_pack({"texts": texts}))
+        (size,) = _HEADER.unpack(self._recv_exactly(conn, _HEADER.size))
+        reply = json.loads(self._recv_exactly(conn, size))
+        if "error" in reply:
+            raise RuntimeError(f"Embedding server error: {reply['error']}")
+        segment = self._attach(reply["shm"])
+        return np.ndarray(reply["shape"], dtype=np.float32, buffer=segment.buf).copy()
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        try:
+            vectors = self._remote_encode(texts)
+        except OSError:
+            self._close()
+            vectors = np.asarray(self._fallback().encode(texts, batch_size=batch_size), dtype=np.float32)
+        return vectors[0] if single else vectors
+
+if __name__ == "__main__":
+    from config import EMBED_BACKEND, EMBED_MODEL_NAME, EMBED_ONNX_DIR, EMBED_SERVER_SOCKET, EMBED_THREADS
+    from vector_store.embeddings import create_embedder
+
+    parser = argparse.ArgumentParser(description="Serve embeddings to local router processes.")
+    parser.add_argument("--socket", default=EMBED_SERVER_SOCKET or "/tmp/agents_embed.sock")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    embedder = create_embedder(EMBED_BACKEND, EMBED_MODEL_NAME, EMBED_THREADS, EMBED_ONNX_DIR)
+    asyncio.run(EmbedServer(embedder, args.socket, args.max_batch, args.max_wait_ms).serve())
@@ -0,0 +1,114 @@
+"""
+Embedding backends.
+
+All backends expose the subset of SentenceTransformer.encode used by the
+project: a string gives one vector, a list gives a (n, dim) float32 array.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+from utils.bm25 import tokenize
+
+class TorchEmbedder:
+    """Runs the SentenceTransformer model with PyTorch."""
+
+    def __init__(self, model_name, threads=None):
+        import torch
+        from sentence_transformers import SentenceTransformer
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        return self.model.encode(sentences, batch_size=batch_size, **kwargs)
+
+class OnnxEmbedder:
+    """
+    Runs an exported (optionally int8-quantized) copy of the model with ONNX Runtime.
+
+    Expects `model.onnx` (or `model_quantized.onnx` when quantized=True) and
+    `tokenizer.json` in model_dir, as written by rag_setup/export_onnx.py.
+    Applies the same mean pooling and L2 normalization as all-MiniLM-L6-v2.
+
+    Args:
+        model_dir (str): Directory with the exported model and tokenizer.
+        threads (int, optional): ONNX Runtime intra-op threads. Defaults to all cores.
+        quantized (bool): Load the int8-quantized model.
+        max_length (int): Token limit per sentence, as in the original model.
+    """
+
+    def __init__(self, model_dir, threads=None, quantized=False, max_length=256):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or 0
+        options.inter_op_num_threads = 1
+        filename = "model_quantized.onnx" if quantized else "model.onnx"
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, filename), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+    def _encode_batch(self, sentences):
+        encodings = self.tokenizer.encode_batch(sentences)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": np.array([e.ids for e in encodings], dtype=np.int64), "attention_mask": mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+        hidden = self.session.run(None, feeds)[0]
+        pooled = (hidden * mask[:, :, None]).sum(axis=1) / np.maximum(mask.sum(axis=1, keepdims=True), 1)
+        return (pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        if isinstance(sentences, str):
+            return self.encode([sentences], batch_size)[0]
+        if not sentences:
+            return np.zeros((0, self.session.get_outputs()[0].shape[-1]), dtype=np.float32)
+        # Batch sentences of similar length together to keep padding small.
+        order = np.argsort([len(s) for s in sentences])
+        vectors = np.concatenate([
+            self._encode_batch([sentences[i] for i in order[start:start + batch_size]])
+            for start in range(0, len(sentences), batch_size)
+        ])
+        result = np.empty_like(vectors)
+        result[order] = vectors
+        return result
+
+class HashEmbedder:
+    """
+    Offline stand-in that embeds text by hashing its words into `dim` buckets.
+
+    Vectors are deterministic and need no model files, so benchmarks can run
+    without network access. Similarity reflects shared words only, not meaning.
+    """
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _embed(self, sentence):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in tokenize(sentence):
+            digest = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+            vector[digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        return vector / max(np.linalg.norm(vector), 1e-12)
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        if isinstance(sentences, str):
+            return self._embed(sentences)
+        return np.array([self._embed(s) for s in sentences], dtype=np.float32).reshape(len(sentences), self.dim)
+
+def create_embedder(backend, model_name, threads=None, onnx_dir=None):
+    """Creates the embedder for a backend name from config.py: "torch", "onnx", "onnx-int8" or "hash"."""
+    if backend == "hash":
+        return HashEmbedder()
+    if backend == "torch":
+        return TorchEmbedder(model_name, threads)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEmbedder(onnx_dir, threads, quantized=backend == "onnx-int8")
+    raise ValueError(f"Unknown embedding backend: {backend}")
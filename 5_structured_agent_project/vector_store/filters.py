@@ -0,0 +1,40 @@
+"""
+Metadata filters in Chroma's `where` syntax, for the in-process backends.
+
+Supported: {"field": value} equality, {"field": {"$op": value}} with $eq, $ne,
+$gt, $gte, $lt, $lte, $in and $nin, and {"$and": [...]} / {"$or": [...]}.
+"""
+
+_OPERATORS = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+}
+
+def matches(metadata, where):
+    """Returns True if a document's metadata dict satisfies the filter."""
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, target in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported filter operator: {op}")
+                try:
+                    if not _OPERATORS[op](value, target):
+                        return False
+                except TypeError:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+from vector_store.numpy_store import NumpyStore
+
+class IVFStore(NumpyStore):
+    """
+    Approximate VectorStore: an inverted-file (IVF) index over NumpyStore's matrix.
+
+    `build()` clusters the embeddings with spherical k-means into `nlist`
+    centroids and assigns every row to its nearest one. A query scores the
+    centroids, then searches only the rows of the `nprobe` closest clusters
+    against the full-precision memory-mapped vectors. Rows added after the
+    build are assigned to their nearest centroid as they arrive. Until the
+    index is built, queries fall back to exact search. With a `where` filter,
+    only matching rows of the probed clusters are scored; if fewer than top_k
+    of them match, the query falls back to exact search over the matches.
+
+    Args:
+        path (str): Directory holding the index files.
+        nlist (int): Number of clusters to build.
+        nprobe (int): Clusters searched per query; higher is slower with better recall.
+    """
+
+    def __init__(self, path, nlist=256, nprobe=8):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self._ivf_path = os.path.join(path, "ivf.npz")
+        super().__init__(path)
+
+    def _load(self):
+        super()._load()
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self._lists = None
+        if os.path.exists(self._ivf_path):
+            with np.load(self._ivf_path) as data:
+                self.centroids = data["centroids"]
+                self.assignments = data["assignments"][:len(self.ids)]
+            # Rows appended by another process since it last saved.
+            if len(self.assignments) < len(self.ids):
+                self.assignments = np.concatenate([self.assignments, self._assign(self.matrix[len(self.assignments):])])
+
+    def save(self):
+        with open(self._ivf_path + ".tmp", "wb") as f:
+            np.savez(f, centroids=self.centroids, assignments=self.assignments)
+        os.replace(self._ivf_path + ".tmp", self._ivf_path)
+
+    def _assign(self, rows, batch_size=65536):
+        """Returns the nearest centroid of each row."""
+        parts = [
+            np.argmax(np.asarray(rows[i:i + batch_size]) @ self.centroids.T, axis=1).astype(np.int32)
+            for i in range(0, len(rows), batch_size)
+        ]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32)
+
+    def build(self, nlist=None, iterations=10, sample_size=None, seed=0):
+        """
+        Trains the centroids with spherical k-means and assigns every row.
+
+        Args:
+            nlist (int, optional): Number of clusters. Defaults to self.nlist.
+            iterations (int): k-means iterations.
+            sample_size (int, optional): Rows used for training. Defaults to 64 per cluster.
+            seed (int): Random seed for sampling and initialization.
+        """
+        self._refresh()
+        n = len(self.ids)
+        if n == 0:
+            raise ValueError("Cannot build an IVF index over an empty store")
+        self.nlist = min(nlist or self.nlist, n)
+        rng = np.random.default_rng(seed)
+        sample_size = min(n, sample_size or 64 * self.nlist)
+        sample = np.asarray(self.matrix[np.sort(rng.choice(n, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, self.nlist, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=self.nlist) == 0
+            # Re-seed empty clusters with random sample rows.
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = self._normalize(sums)
+        self.centroids = centroids
+        self.assignments = self._assign(self.matrix)
+        self._lists = None
+        self.save()
+
+    def _inverted_lists(self):
+        """Returns (rows sorted by cluster, offset of each cluster's first row)."""
+        if self._lists is None:
+            order = np.argsort(self.assignments, kind="stable")
+            offsets = np.searchsorted(self.assignments[order], np.arange(len(self.centroids) + 1))
+            self._lists = (order, offsets)
+        return self._lists
+
+    def add(self, ids, embeddings, documents, metadatas=None):
+        self._refresh()
+        start = len(self.ids)
+        super().add(ids, embeddings, documents, metadatas)
+        if self.centroids is not None and len(self.ids) > start:
+            self.assignments = np.concatenate([self.assignments, self._assign(self.matrix[start:])])
+            self._lists = None
+            self.save()
+
+    def delete(self, ids):
+        self._refresh()
+        if self.centroids is not None:
+            drop = [self._positions[doc_id] for doc_id in ids if doc_id in self._positions]
+            self.assignments = np.delete(self.assignments, drop)
+            self.save()
+        super().delete(ids)
+
+    def query(self, embeddings, top_k, where=None, nprobe=None):
+        self._refresh()
+        if self.centroids is None:
+            return super().query(embeddings, top_k, where)
+        order, offsets = self._inverted_lists()
+        nprobe = nprobe or self.nprobe
+        mask = self._mask(where)
+        hits = []
+        for q in self._normalize(embeddings):
+            probe = self._best(self.centroids @ q, nprobe)
+            candidates = np.sort(np.concatenate([order[offsets[c]:offsets[c + 1]] for c in probe]))
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+                if len(candidates) < top_k:
+                    candidates = np.flatnonzero(mask)
+            scores = self.matrix[candidates] @ q
+            best = self._best(scores, top_k)
+            hits.append((candidates[best], scores[best]))
+        return self._results(hits)
@@ -0,0 +1,190 @@
+import json
+import os
+
+import numpy as np
+from vector_store.base import VectorStore
+from vector_store.filters import matches
+
+class NumpyStore(VectorStore):
+    """
+    In-process VectorStore over a memory-mapped float32 matrix.
+
+    Embeddings are L2-normalized and appended to `<path>/embeddings.f32`, one
+    row per document; ids, documents and metadata go to `<path>/records.jsonl`
+    in the same order. Queries are a single matmul against the memory-mapped matrix
+    plus argpartition, so several processes opening the same path share one
+    page-cached copy of the index. `where` filters are evaluated against the
+    metadata in memory and restrict which rows are scored.
+
+    Args:
+        path (str): Directory holding the index files.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._embeddings_path = os.path.join(path, "embeddings.f32")
+        self._records_path = os.path.join(path, "records.jsonl")
+        self._meta_path = os.path.join(path, "meta.json")
+        self._load()
+
+    def _load(self):
+        self.dim = None
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.dim = json.load(f)["dim"]
+        self.ids, self.documents, self.metadatas = [], [], []
+        self._masks = {}
+        ends = [0]  # byte offset at which each record ends
+        if os.path.exists(self._records_path):
+            with open(self._records_path, "rb") as f:
+                for line in f:
+                    ends.append(ends[-1] + len(line))
+                    record = json.loads(line)
+                    self.ids.append(record["id"])
+                    self.documents.append(record["document"])
+                    self.metadatas.append(record.get("metadata", {}))
+        self._loaded = self._signature()
+        # Only rows whose embeddings are fully written are visible.
+        rows = self._loaded[1] // (4 * self.dim) if self._loaded and self.dim else 0
+        del self.ids[rows:], self.documents[rows:], self.metadatas[rows:]
+        self._records_end = ends[len(self.ids)]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        if self.ids:
+            self.matrix = np.memmap(self._embeddings_path, dtype=np.float32, mode="r", shape=(len(self.ids), self.dim))
+        else:
+            self.matrix = np.zeros((0, self.dim or 0), dtype=np.float32)
+
+    def _signature(self):
+        """Identifies the embeddings file's current contents: every add or delete changes it."""
+        try:
+            st = os.stat(self._embeddings_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _refresh(self):
+        """Reloads the index if another process has changed it."""
+        if self._signature() != self._loaded:
+            self._load()
+
+    @staticmethod
+    def _normalize(embeddings):
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+    def add(self, ids, embeddings, documents, metadatas=None):
+        self._refresh()
+        embeddings = self._normalize(embeddings)
+        metadatas = metadatas or [{}] * len(ids)
+        keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._positions]
+        if not keep:
+            return
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+            with open(self._meta_path, "w") as f:
+                json.dump({"dim": self.dim}, f)
+        # Records first: a reader only maps as many rows as the embeddings file holds.
+        # Drop records and partial rows left behind by an interrupted add first,
+        # so new records and rows line up.
+        if os.path.exists(self._records_path):
+            os.truncate(self._records_path, self._records_end)
+        if os.path.exists(self._embeddings_path):
+            os.truncate(self._embeddings_path, len(self.ids) * 4 * self.dim)
+        with open(self._records_path, "a") as f:
+            for i in keep:
+                f.write(json.dumps(self._record(ids[i], documents[i], metadatas[i])) + "\n")
+            self._records_end = f.tell()
+        with open(self._embeddings_path, "ab") as f:
+            f.write(embeddings[keep].tobytes())
+        for i in keep:
+            self._positions[ids[i]] = len(self.ids)
+            self.ids.append(ids[i])
+            self.documents.append(documents[i])
+            self.metadatas.append(metadatas[i] or {})
+        self._masks = {}
+        self._loaded = self._signature()
+        self.matrix = np.memmap(self._embeddings_path, dtype=np.float32, mode="r", shape=(len(self.ids), self.dim))
+
+    @staticmethod
+    def _record(doc_id, document, metadata):
+        record = {"id": doc_id, "document": document}
+        if metadata:
+            record["metadata"] = metadata
+        return record
+
+    def _mask(self, where):
+        """Returns a boolean row mask for a metadata filter, or None for no filter."""
+        if not where:
+            return None
+        key = json.dumps(where, sort_keys=True)
+        if key not in self._masks:
+            self._masks[key] = np.fromiter((matches(m, where) for m in self.metadatas), dtype=bool, count=len(self.ids))
+        return self._masks[key]
+
+    @staticmethod
+    def _best(scores, top_k):
+        """Returns the indices of the top_k scores, best first."""
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates])]
+
+    def _results(self, hits):
+        """Formats per-query (rows, similarities) pairs as query results."""
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for rows, similarities in hits:
+            results["ids"].append([self.ids[i] for i in rows])
+            results["documents"].append([self.documents[i] for i in rows])
+            results["metadatas"].append([self.metadatas[i] for i in rows])
+            results["distances"].append((1.0 - similarities).tolist())
+        return results
+
+    def query(self, embeddings, top_k, where=None):
+        self._refresh()
+        queries = self._normalize(embeddings)
+        mask = self._mask(where)
+        rows = np.arange(len(self.ids)) if mask is None else np.flatnonzero(mask)
+        if len(rows) == 0:
+            scores = np.zeros((len(queries), 0), dtype=np.float32)
+        elif mask is None:
+            scores = queries @ self.matrix.T
+        else:
+            scores = queries @ self.matrix[rows].T
+        hits = []
+        for row in scores:
+            best = self._best(row, top_k)
+            hits.append((rows[best], row[best]))
+        return self._results(hits)
+
+    def delete(self, ids):
+        self._refresh()
+        drop = {self._positions[doc_id] for doc_id in ids if doc_id in self._positions}
+        if not drop:
+            return
+        keep = [i for i in range(len(self.ids)) if i not in drop]
+        matrix = np.array(self.matrix[keep])
+        records = [self._record(self.ids[i], self.documents[i], self.metadatas[i]) for i in keep]
+        # Rewrite both files and swap them in atomically.
+        with open(self._records_path + ".tmp", "w") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        with open(self._embeddings_path + ".tmp", "wb") as f:
+            f.write(matrix.tobytes())
+        os.replace(self._records_path + ".tmp", self._records_path)
+        os.replace(self._embeddings_path + ".tmp", self._embeddings_path)
+        self._load()
+
+    def get_documents(self):
+        self._refresh()
+        return list(self.ids), list(self.documents), list(self.metadatas)
+
+    def count(self):
+        self._refresh()
+        return len(self.ids)
+
+    def version(self):
+        self._refresh()
+        return self._loaded
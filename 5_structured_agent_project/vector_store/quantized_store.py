@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+from vector_store.numpy_store import NumpyStore
+from vector_store.quantization import QUANTIZERS
+
+class QuantizedStore(NumpyStore):
+    """
+    NumpyStore that scans compact codes and reranks with full precision.
+
+    Alongside NumpyStore's float32 matrix, every row is encoded as int8 or
+    binary codes in `<path>/codes.<quantization>`. A query scores all codes
+    first, keeps the best `rerank * top_k` candidates, and rescores only
+    those rows from the memory-mapped float32 matrix. Only the codes need
+    to stay resident in RAM.
+
+    Args:
+        path (str): Directory holding the index files.
+        quantization (str): "int8" or "binary".
+        rerank (int): Candidates kept per result for the exact rerank.
+    """
+
+    # Rows scored per step, so the temporary float copies stay small.
+    SCAN_CHUNK = 65536
+
+    def __init__(self, path, quantization="int8", rerank=4):
+        self.quantizer = QUANTIZERS[quantization]()
+        self.rerank = rerank
+        self._codes_path = os.path.join(path, f"codes.{quantization}")
+        super().__init__(path)
+
+    def _load(self):
+        super()._load()
+        width = self.quantizer.width(self.dim) if self.dim else 0
+        itemsize = np.dtype(self.quantizer.dtype).itemsize
+        coded = os.path.getsize(self._codes_path) // (width * itemsize) if width and os.path.exists(self._codes_path) else 0
+        # Encode rows written before quantization was enabled (or by a writer without it).
+        if coded < len(self.ids):
+            self._append_codes(self.matrix[coded:])
+        self._map_codes()
+
+    def _append_codes(self, rows):
+        with open(self._codes_path, "ab") as f:
+            for start in range(0, len(rows), self.SCAN_CHUNK):
+                f.write(self.quantizer.encode(np.asarray(rows[start:start + self.SCAN_CHUNK])).tobytes())
+
+    def _map_codes(self):
+        if self.ids:
+            shape = (len(self.ids), self.quantizer.width(self.dim))
+            self.codes = np.memmap(self._codes_path, dtype=self.quantizer.dtype, mode="r", shape=shape)
+        else:
+            self.codes = np.zeros((0, 0), dtype=self.quantizer.dtype)
+
+    def add(self, ids, embeddings, documents, metadatas=None):
+        self._refresh()
+        vectors = self._normalize(embeddings)
+        keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._positions]
+        if not keep:
+            return
+        # Codes go in before the float rows, so a reader never maps a row without its code.
+        # Drop codes left behind by an interrupted add first.
+        if os.path.exists(self._codes_path) and self.dim:
+            row_bytes = self.quantizer.width(self.dim) * np.dtype(self.quantizer.dtype).itemsize
+            os.truncate(self._codes_path, len(self.ids) * row_bytes)
+        self._append_codes(vectors[keep])
+        super().add(ids, embeddings, documents, metadatas)
+        self._map_codes()
+
+    def delete(self, ids):
+        self._refresh()
+        if any(doc_id in self._positions for doc_id in ids) and os.path.exists(self._codes_path):
+            # The codes are re-encoded from the compacted matrix when it reloads.
+            os.remove(self._codes_path)
+        super().delete(ids)
+
+    def memory_bytes(self):
+        """Returns (code bytes, full-precision bytes) of the index."""
+        return self.codes.nbytes, self.matrix.nbytes
+
+    def query(self, embeddings, top_k, where=None, rerank=None):
+        self._refresh()
+        queries = self._normalize(embeddings)
+        n_candidates = top_k * (rerank or self.rerank)
+        mask = self._mask(where)
+        if mask is not None:
+            n_candidates = min(n_candidates, int(mask.sum()))
+        hits = []
+        for q in queries:
+            approx = np.concatenate([
+                self.quantizer.scores(self.codes[start:start + self.SCAN_CHUNK], q)
+                for start in range(0, len(self.ids), self.SCAN_CHUNK)
+            ]) if self.ids else np.zeros(0, dtype=np.float32)
+            if mask is not None:
+                approx[~mask] = approx.min() - 1
+            candidates = np.sort(self._best(approx, n_candidates))
+            scores = self.matrix[candidates] @ q if len(candidates) else np.zeros(0, dtype=np.float32)
+            best = self._best(scores, top_k)
+            hits.append((candidates[best], scores[best]))
+        return self._results(hits)